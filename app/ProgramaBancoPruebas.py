@@ -1,18 +1,35 @@
-import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
-from scipy.integrate import trapezoid, cumulative_trapezoid
-from PIL import Image, ImageTk
 import sys, ctypes, os
-import serial
+import multiprocessing
 import threading
 import time
-import serial.tools.list_ports
+from collections import deque
+from protocolo_serial import formatear_csv
+from instrumentacion import MedidorEtapas
+from buffer_circular import BufferCircular
+from decimacion import decimar_ventana
+# matplotlib, scipy, pandas, PIL, pyserial y los módulos de análisis que dependen de ellos
+# se importan dentro del método de la pantalla que los usa: el menú aparece sin cargarlos
 
 # ===== Configuración general =====
+def carpeta_datos():
+    """Carpeta escribible para los datos del programa (la base de la campaña).
+
+    Empaquetado (PyInstaller), junto al ejecutable: la carpeta temporal donde se extrae el
+    paquete se borra al salir. Si no, la carpeta de datos del usuario, no la del código,
+    que puede estar en una instalación de solo lectura.
+    """
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'BancoPruebas')
+
+
 class Config:
     font = ('Segoe UI', 11)
     button_style = 'Custom.TButton'
@@ -21,6 +38,19 @@ class Config:
     bg_color = '#f0f2f5'
     primary_color = '#007BFF'
     text_color = '#ffffff'
+    fps_grabacion = 25            # Refrescos por segundo de la pantalla de grabación
+    ventana_grabacion_s = 10.0    # Segundos visibles en la gráfica en vivo
+    muestras_grafica_vivo = 1 << 16
+    max_puntos_marcados = 2000    # Por encima de esto no se dibujan los marcadores de cada muestra
+    montecarlo_corridas = 20000
+    montecarlo_semilla = 12345
+    campana_db = os.path.join(carpeta_datos(), "campana.sqlite")
+    max_lineas_log = 500          # Líneas que conserva el registro de la grabación en pantalla
+    muestras_por_fragmento = 1 << 16  # Tamaño de cada fragmento de la grabación en disco
+    mostrar_tiempos = False       # Panel con la latencia de cada etapa durante la grabación
+    intervalo_tiempos_s = 0.5     # Cada cuánto se actualiza ese panel
+    motor_diametro_mm = 29.0      # Valores iniciales del formulario de exportación de motor
+    motor_largo_mm = 124.0
 
 # ===== Colores para gráficas =====
 GRAPH_COLORS = {
@@ -30,6 +60,25 @@ GRAPH_COLORS = {
     'impulso': 'purple'
 }
 
+# ===== Unidades de cada gráfica =====
+UNIDADES = {
+    'Fuerza_N': 'N',
+    'velocidad': 'm/s',
+    'altura': 'm'
+}
+
+# ===== Modelos de consumo de propelente disponibles en la interfaz =====
+MODELOS_MASA_UI = {
+    'Lineal en el tiempo': 'lineal',
+    'Proporcional al impulso': 'impulso'
+}
+
+# ===== Formatos de transmisión serie =====
+MODOS_SERIAL_UI = {
+    'ASCII (9600 baudios)': 'ascii',
+    'Binario (115200 baudios)': 'binario'
+}
+
 # ===== Clase principal de la app =====
 class BancoPruebas:
     def __init__(self):
@@ -38,32 +87,65 @@ class BancoPruebas:
         self.window.geometry("1000x800")  # Más alta la ventana
         self.window.minsize(800, 700)
         self.window.configure(bg=Config.bg_color)
-        # Establece el icono de la ventana y barra de tareas (usa PNG para compatibilidad)
-        try:
-            icon_path_png = os.path.join(os.path.dirname(__file__), "LogoBancoPruebas.png")
-            if os.path.exists(icon_path_png):
-                icon_img = ImageTk.PhotoImage(Image.open(icon_path_png), master=self.window)
-                self.window.iconphoto(True, icon_img)
-        except Exception as e:
-            print(f"Icono no cargado: {e}")
+        # Imágenes ya decodificadas y redimensionadas, por (archivo, tamaño)
+        self._imagenes = {}
+        # Icono de la ventana y barra de tareas: el mismo logo que muestra el menú
+        icono = self.load_image('LogoBancoPruebas.png', (150, 150))
+        if icono:
+            self.window.iconphoto(True, icono)
         self.df = None
         self.archivo_cargado = None
         self.calculos = {}
+        # Los resultados solo se recalculan si cambian los datos o las masas
+        self._version_datos = 0
+        self._clave_calculos = None
+        self._cache_montecarlo = (None, None)
+        self._cache_vuelo = (None, None)
+        self.campana = None
+        self.opciones_motor = {}
         self.masa_total_inicial = 5.000
         self.masa_propelente = 0.400
+        self.modelo_masa = 'lineal'
+        self.coef_arrastre = 0.5
+        self.diametro = 0.08
+        # Señal cruda del archivo cargado, para poder rehacer el preprocesado sin releerlo
+        self._crudo = None
+        self.preprocesar = False
+        self._preprocesado_aplicado = False
         self.tiempo = None
         self.fuerza = None
         self.current_view = None
         self.graph_canvas = None
-        self.serial_thread = None
-        self.serial_stop_event = threading.Event()
-        self.serial_port = None
-        self.serial_baud = 9600
+        # Vistas que se ocultan en lugar de destruirse al cambiar de pantalla
+        self.vistas_persistentes = set()
+        self.vistas_graficas = {}
+        self.adquisidor = None
+        # Se llama desde refrescar_grabacion cuando el hilo de una grabación detenida termina
+        self._al_terminar_grabacion = None
+        self._archivo_grabacion = None
+        self.serial_ports = []
+        self.serial_modo = 'ascii'
         self.serial_filename = "empuje_arduino.csv"
+        # El hilo serie deja aquí muestras y líneas; la interfaz las consume con un temporizador
+        self.buffer_vivo = BufferCircular(Config.muestras_grafica_vivo)
+        self.cola_log = deque(maxlen=Config.max_lineas_log)
+        self.grafica_vivo = None
+        self._leidas_vivo = 0
+        self._frecuencia_vivo = None
+        self.acumulador = None
+        self.resultados_vivo_label = None
+        self.medidor = MedidorEtapas()
+        self.mostrar_tiempos = Config.mostrar_tiempos
+        self.tiempos_label = None
+        self._ultimo_panel_tiempos = 0.0
+        self.menu_frame = None
         self.setup_styles()
         self.create_main_menu()
         self.center_window()
         self.window.bind("<Configure>", self.on_resize)
+        self.refrescar_grabacion()
+
+    def ejecutar(self):
         self.window.mainloop()
 
     def setup_styles(self):
@@ -76,15 +158,30 @@ class BancoPruebas:
 
     def clear_window(self):
         for widget in self.window.winfo_children():
-            widget.destroy()
+            if widget in self.vistas_persistentes:
+                widget.pack_forget()
+            else:
+                widget.destroy()
         self.graph_canvas = None
+        self.grafica_vivo = None
+        self.resultados_vivo_label = None
+        self.tiempos_label = None
 
     def create_main_menu(self):
+        # El menú se construye una sola vez; al volver solo se muestra y se actualiza su estado
         self.clear_window()
+        if self.menu_frame is None:
+            self.construir_menu()
+            self.vistas_persistentes.add(self.menu_frame)
+        self.menu_frame.pack(fill=tk.BOTH, expand=True)
+        self.current_view = self.menu_frame
+        self.serial_text = self.serial_text_menu
+        self.actualizar_menu()
+
+    def construir_menu(self):
         # Frame principal con menos separación
         frame = ttk.Frame(self.window, padding="30 20 30 20")
-        frame.pack(fill=tk.BOTH, expand=True)
-        self.current_view = frame
+        self.menu_frame = frame
 
         logo = self.load_image('LogoBancoPruebas.png', (150, 150))
         if logo:
@@ -107,9 +204,27 @@ class BancoPruebas:
         self.masa_prop_entry.insert(0, str(self.masa_propelente))
         self.masa_prop_entry.grid(row=1, column=1, padx=8, sticky="ew", pady=5)
 
-        archivo_txt = f"Archivo cargado: {os.path.basename(self.archivo_cargado)}" if self.archivo_cargado else "Archivo cargado: Ninguno"
-        color_txt = 'green' if self.archivo_cargado else 'red'
-        self.file_label = ttk.Label(frame, text=archivo_txt, font=Config.font, foreground=color_txt)
+        ttk.Label(entry_frame, text="Modelo de consumo de propelente:").grid(row=2, column=0, sticky="w", pady=5)
+        modelo_txt = next(k for k, v in MODELOS_MASA_UI.items() if v == self.modelo_masa)
+        self.modelo_masa_var = tk.StringVar(value=modelo_txt)
+        ttk.Combobox(entry_frame, textvariable=self.modelo_masa_var, values=list(MODELOS_MASA_UI),
+                     state="readonly").grid(row=2, column=1, padx=8, sticky="ew", pady=5)
+
+        ttk.Label(entry_frame, text="Coeficiente de arrastre (Cd):").grid(row=3, column=0, sticky="w", pady=5)
+        self.cd_entry = ttk.Entry(entry_frame)
+        self.cd_entry.insert(0, str(self.coef_arrastre))
+        self.cd_entry.grid(row=3, column=1, padx=8, sticky="ew", pady=5)
+
+        ttk.Label(entry_frame, text="Diámetro del cohete (m):").grid(row=4, column=0, sticky="w", pady=5)
+        self.diametro_entry = ttk.Entry(entry_frame)
+        self.diametro_entry.insert(0, str(self.diametro))
+        self.diametro_entry.grid(row=4, column=1, padx=8, sticky="ew", pady=5)
+
+        self.preprocesar_var = tk.BooleanVar(value=self.preprocesar)
+        ttk.Checkbutton(entry_frame, text="Preprocesar señal (filtrado, deriva, detección de quemado)",
+                        variable=self.preprocesar_var).grid(row=5, column=0, columnspan=2, sticky="w", pady=5)
+
+        self.file_label = ttk.Label(frame, font=Config.font)
         self.file_label.pack(pady=(0, 20))  # Separación moderada debajo del label
 
         # Botones principales
@@ -121,6 +236,8 @@ class BancoPruebas:
             ("🚀 Velocidad", lambda: self.plot_graph('velocidad', 'Velocidad (m/s)')),
             ("🌌 Altura", lambda: self.plot_graph('altura', 'Altura (m)')),
             ("📊 Resultados", self.mostrar_resultados),
+            ("🎲 Monte Carlo", self.mostrar_montecarlo),
+            ("🗂 Campaña", self.mostrar_campana),
             ("❌ Salir", self.window.destroy)
         ]
         btn_frame = ttk.Frame(frame)
@@ -135,38 +252,48 @@ class BancoPruebas:
             )
             btn.pack(fill=tk.X, pady=1, padx=1)
             self.buttons[text] = btn
-            if "Cargar" not in text and "Salir" not in text and "Grabar" not in text:
-                btn.config(state=tk.NORMAL if self.df is not None else tk.DISABLED)
 
         # Área para mostrar la grabación serial en tiempo real
-        self.serial_text = tk.Text(frame, height=8, state=tk.DISABLED, font=('Consolas', 10))
-        self.serial_text.pack(fill=tk.X, padx=4, pady=(8,0))
+        self.serial_text_menu = tk.Text(frame, height=8, state=tk.DISABLED, font=('Consolas', 10))
+        self.serial_text_menu.pack(fill=tk.X, padx=4, pady=(8,0))
+
+    def actualizar_menu(self):
+        archivo_txt = f"Archivo cargado: {os.path.basename(self.archivo_cargado)}" if self.archivo_cargado else "Archivo cargado: Ninguno"
+        self.file_label.config(text=archivo_txt, foreground='green' if self.archivo_cargado else 'red')
+        for text, btn in self.buttons.items():
+            if "Cargar" not in text and "Salir" not in text and "Grabar" not in text and "Campaña" not in text:
+                btn.config(state=tk.NORMAL if self.df is not None else tk.DISABLED)
 
     def load_image(self, filename, size):
+        clave = (filename, size)
+        if clave in self._imagenes:
+            return self._imagenes[clave]
+        imagen = None
         try:
             path = os.path.join(os.path.dirname(__file__), filename)
             if os.path.exists(path):
+                from PIL import Image, ImageTk
                 img = Image.open(path).resize(size, Image.LANCZOS)
-                return ImageTk.PhotoImage(img)
+                imagen = ImageTk.PhotoImage(img, master=self.window)
         except Exception as e:
             print(f"Error cargando imagen: {e}")
-        return None
+        self._imagenes[clave] = imagen
+        return imagen
 
     def cargar_csv(self):
-        archivo = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        archivo = filedialog.askopenfilename(filetypes=[("Grabaciones", "*.csv *.bpm"), ("CSV Files", "*.csv"),
+                                                        ("Binario columnar", "*.bpm")])
         if not archivo:
             return
         try:
-            df = pd.read_csv(archivo)
-            df["Fuerza_N"] = df["Fuerza_kg"] * 9.81
-            df["Tiempo_s"] = df["Tiempo_ms"] / 1000.0
-            df = df[df["Fuerza_N"] > 0.5]
-            self.tiempo = df["Tiempo_s"].values
-            self.fuerza = df["Fuerza_N"].values
-            self.df = df
+            from almacenamiento import leer_crudo
+            # Copia en memoria: un .bpm mapeado podría reescribirse después con una grabación
+            # al mismo archivo (y en Windows, mientras esté mapeado, no se podría sustituir)
+            self._crudo = tuple(np.array(columna) for columna in leer_crudo(archivo))
+            self.actualizar_masas()
+            self.preparar_senal()
             self.archivo_cargado = archivo
             self.file_label.config(text=f"Archivo cargado: {os.path.basename(archivo)}", foreground='green')
-            self.actualizar_masas()
             self.calcular_datos()
             for text, btn in self.buttons.items():
                 if "Cargar" not in text and "Salir" not in text:
@@ -178,63 +305,67 @@ class BancoPruebas:
         try:
             self.masa_total_inicial = float(self.masa_total_entry.get())
             self.masa_propelente = float(self.masa_prop_entry.get())
+            self.modelo_masa = MODELOS_MASA_UI.get(self.modelo_masa_var.get(), 'lineal')
+            self.coef_arrastre = float(self.cd_entry.get())
+            self.diametro = float(self.diametro_entry.get())
+            self.preprocesar = bool(self.preprocesar_var.get())
         except Exception as e:
             print(f"Error actualizando masas: {e}")
+
+    def preparar_senal(self):
+        # Pasa la señal cruda a tiempo/empuje con o sin la cadena de preprocesado
+        from analisis import preparar_datos
+        preprocesado = None
+        if self.preprocesar:
+            # procesamiento carga scipy.signal: solo se importa si se usa
+            from procesamiento import preprocesado_por_defecto
+            preprocesado = preprocesado_por_defecto()
+        self.df, self.tiempo, self.fuerza = preparar_datos(*self._crudo, preprocesado=preprocesado)
+        self._preprocesado_aplicado = self.preprocesar
+        self._version_datos += 1
  
     def calcular_datos(self):
         if self.df is None:
             return
-        masa_estructura = self.masa_total_inicial - self.masa_propelente
-
-        # --- Cálculo de masa instantánea ---
-        # La masa instantánea solo disminuye durante el tiempo de quemado, luego se queda en masa_estructura.
-        tiempo_quemado = self.tiempo[-1] - self.tiempo[0]
-        masa_instantanea = np.array([
-            self.masa_total_inicial - self.masa_propelente * ((t - self.tiempo[0]) / tiempo_quemado)
-            if (t - self.tiempo[0]) <= tiempo_quemado else masa_estructura
-            for t in self.tiempo
-        ])
-
-
-        # --- Cálculo de aceleración, velocidad y altura ---
-        a = self.fuerza / masa_instantanea
-        v = cumulative_trapezoid(a, self.tiempo, initial=0)
-        h = cumulative_trapezoid(v, self.tiempo, initial=0)
-        self.df['aceleracion'] = a
-        self.df['velocidad'] = v
-        self.df['altura'] = h
-
-        # --- Altura balística después del quemado ---
-        # Esto es correcto: suma la altura ganada durante el quemado y la subida balística
-        v_final = v[-1]
-        h_burn = h[-1]
-        h_ballistic = (v_final ** 2) / (2 * 9.81)
-        apogeo_total = h_burn + h_ballistic
-
-        # --- Impulso total ---
-        impulso_total = trapezoid(self.fuerza, self.tiempo)
-
-        # --- Isp (impulso específico) ---
-        # Isp = impulso_total / (masa_propelente * g)
-        Isp = impulso_total / (self.masa_propelente * 9.81) if self.masa_propelente > 0 else 0
-
-        # --- Relación empuje/peso inicial ---
-        relacion_empuje_peso = self.fuerza.max() / (self.masa_total_inicial * 9.81) if self.masa_total_inicial > 0 else 0
-
-        # --- Guardar resultados ---
-        self.calculos = {
-            'empuje_max': self.fuerza.max(),
-            'impulso_total': impulso_total,
-            'tiempo_quemado': tiempo_quemado,
-            'masa_propelente': self.masa_propelente,
-            'masa_estructura': masa_estructura,
-            'Isp': Isp,
-            'vel_final': v_final,
-            'apogeo': apogeo_total,
-            'tiempo_apogeo': self.tiempo[-1] + v_final / 9.81,
-            'aceleracion_max': a.max(),
-            'relacion_empuje_peso': relacion_empuje_peso
-        }
+        if self._crudo is not None and self.preprocesar != self._preprocesado_aplicado:
+            self.preparar_senal()
+        clave = (self._version_datos, self.masa_total_inicial, self.masa_propelente, self.modelo_masa,
+                 self.coef_arrastre, self.diametro)
+        if clave == self._clave_calculos:
+            return
+        from analisis import calcular_resultados
+        self.calculos, series = calcular_resultados(
+            self.tiempo, self.fuerza, self.masa_total_inicial, self.masa_propelente, self.modelo_masa)
+        for col, valores in series.items():
+            self.df[col] = valores
+        clave_vuelo, vuelo = self._cache_vuelo
+        if clave_vuelo == clave:
+            self.calculos.update(vuelo)
+        self._clave_calculos = clave
+
+    def obtener_campana(self):
+        if self.campana is None:
+            from campana import Campana
+            os.makedirs(os.path.dirname(Config.campana_db), exist_ok=True)
+            self.campana = Campana(Config.campana_db)
+        return self.campana
+
+    def registrar_en_campana(self, archivo, calculos, tiempo, fuerza):
+        # Solo se indexa a petición (botón de resultados) o al terminar una grabación, nunca
+        # al recalcular: así las métricas guardadas no cambian con cada masa que se prueba
+        from campana import traza_reducida
+        self.obtener_campana().registrar(
+            archivo, calculos, self.masa_total_inicial, self.masa_propelente, self.modelo_masa,
+            traza=traza_reducida(tiempo, fuerza), muestras=len(tiempo))
+
+    def registrar_grabacion(self, archivo):
+        from analisis import leer_datos, calcular_resultados
+        _, tiempo, fuerza = leer_datos(archivo)
+        if len(tiempo) < 2:
+            raise ValueError("sin muestras de empuje")
+        calculos, _ = calcular_resultados(tiempo, fuerza, self.masa_total_inicial, self.masa_propelente,
+                                          self.modelo_masa)
+        self.registrar_en_campana(archivo, calculos, tiempo, fuerza)
 
     def mostrar_resultados(self):
         self.actualizar_masas()
@@ -264,56 +395,119 @@ class BancoPruebas:
             ("Velocidad final", f"{res['vel_final']:.2f} m/s ({res['vel_final']*3.6:.2f} km/h)"),
             ("Apogeo estimado", f"{res['apogeo']:.2f} m"),
             ("Tiempo hasta apogeo", f"{res['tiempo_apogeo']:.2f} s"),
+            ("Apogeo simulado (gravedad y arrastre)", None),
+            ("Tiempo hasta apogeo simulado", None),
             ("Aceleración máxima", f"{res['aceleracion_max']:.2f} m/s² ({res['aceleracion_max']/9.81:.2f} g)"),
             ("Relación empuje/peso", f"{res['relacion_empuje_peso']:.2f}")
         ]
+        etiquetas_vuelo = []
         for label, value in items:
             row = ttk.Frame(card, style="Card.TFrame")
             row.pack(fill=tk.X, pady=3)
             ttk.Label(row, text=f"• {label}:", style="CardItem.TLabel", anchor="w").pack(side=tk.LEFT)
-            ttk.Label(row, text=value, style="CardValue.TLabel", anchor="e").pack(side=tk.RIGHT)
+            valor = ttk.Label(row, text=value or "calculando...", style="CardValue.TLabel", anchor="e")
+            valor.pack(side=tk.RIGHT)
+            if value is None:
+                etiquetas_vuelo.append(valor)
+        ttk.Button(card, text="💾 Exportar motor (.eng / .rse)", command=self.mostrar_exportar_motor,
+                   style=Config.button_style).pack(pady=(20,0))
+        aviso_campana = ttk.Label(card, text="", style="CardItem.TLabel")
+
+        def registrar():
+            try:
+                self.registrar_en_campana(self.archivo_cargado, self.calculos, self.tiempo, self.fuerza)
+                aviso_campana.config(text="Corrida registrada en la campaña", foreground='green')
+            except Exception as e:
+                aviso_campana.config(text=f"Error registrando en la campaña: {e}", foreground='red')
+
+        ttk.Button(card, text="🗂 Registrar en la campaña", command=registrar,
+                   style=Config.button_style).pack(pady=(10,0))
+        aviso_campana.pack()
         ttk.Button(card, text="⬅ Volver al menú", command=self.create_main_menu, style=Config.button_style).pack(pady=20)
+        self.simular_en_segundo_plano(etiquetas_vuelo)
+
+    def simular_en_segundo_plano(self, etiquetas):
+        # La simulación de vuelo solo se pide desde resultados y corre en un hilo: el resto
+        # de pantallas (y cada cambio de masas o Cd) no esperan al integrador
+        def mostrar(vuelo):
+            if all(e.winfo_exists() for e in etiquetas):
+                etiquetas[0].config(text=f"{vuelo['apogeo_simulado']:.2f} m")
+                etiquetas[1].config(text=f"{vuelo['tiempo_apogeo_simulado']:.2f} s")
+
+        clave, vuelo = self._cache_vuelo
+        if clave == self._clave_calculos:
+            mostrar(vuelo)
+            return
+        from trayectoria import simular_vuelo, area_referencia
+        resultado = {}
+        clave = self._clave_calculos
+        args = (self.tiempo, self.fuerza, self.masa_total_inicial, self.masa_propelente,
+                self.coef_arrastre, area_referencia(self.diametro), self.modelo_masa)
+
+        def calcular():
+            try:
+                vuelo = simular_vuelo(*args)
+                resultado['vuelo'] = {'apogeo_simulado': vuelo['apogeo'],
+                                      'tiempo_apogeo_simulado': vuelo['tiempo_apogeo'],
+                                      'vel_max_simulada': vuelo['vel_max']}
+            except Exception as e:
+                resultado['error'] = e
+
+        def esperar():
+            if not resultado:
+                self.window.after(50, esperar)
+                return
+            if 'error' in resultado:
+                if all(e.winfo_exists() for e in etiquetas):
+                    for e in etiquetas:
+                        e.config(text="error", foreground='red')
+                print(f"Error en la simulación de vuelo: {resultado['error']}")
+                return
+            self._cache_vuelo = (clave, resultado['vuelo'])
+            if clave == self._clave_calculos:
+                self.calculos.update(resultado['vuelo'])
+            mostrar(resultado['vuelo'])
+
+        threading.Thread(target=calcular, daemon=True).start()
+        self.window.after(50, esperar)
 
     def plot_graph(self, col, ylabel):
         self.actualizar_masas()
         self.calcular_datos()
         self.clear_window()
 
+        if col not in self.df.columns:
+            canvas_frame = ttk.Frame(self.window)
+            canvas_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=(30,10))
+            ttk.Label(canvas_frame, text=f"Error: columna '{col}' no encontrada. Asegúrese de cargar los datos y calcular antes.", foreground='red').pack()
+            ttk.Button(canvas_frame, text="⬅ Volver al menú", command=self.create_main_menu, style=Config.button_style).pack(pady=(10,0))
+            return
+
+        # La figura de cada tipo de gráfica se crea una sola vez y se reutiliza
+        vista = self.vistas_graficas.get(col)
+        if vista is None:
+            vista = self.crear_vista_grafica(col, ylabel)
+            self.vistas_graficas[col] = vista
+        if vista['clave'] != self._clave_calculos:
+            self.actualizar_vista_grafica(vista, col)
+        vista['frame'].pack(fill=tk.BOTH, expand=True)
+        self.graph_canvas = vista['canvas']
+
+    def crear_vista_grafica(self, col, ylabel):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
         outer_frame = ttk.Frame(self.window)
-        outer_frame.pack(fill=tk.BOTH, expand=True)
+        self.vistas_persistentes.add(outer_frame)
 
         canvas_frame = ttk.Frame(outer_frame)
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=(30,10))
         canvas_frame.pack_propagate(False)
 
         color = GRAPH_COLORS.get(col, 'blue')
-        fig, ax = plt.subplots(figsize=(6, 3), dpi=Config.graph_dpi)
-        try:
-            if col == 'Fuerza_N':
-                ax.plot(self.tiempo, self.df[col], lw=2, color=color)
-                ax.scatter(self.tiempo, self.df[col], color=color, s=10)
-                max_val = self.df[col].max()
-                max_time = self.tiempo[np.argmax(self.df[col])]
-                unidad = "N"
-            elif col == 'velocidad':
-                ax.plot(self.tiempo, self.df[col], lw=2, color=color)
-                max_val = self.df[col].max()
-                max_time = self.tiempo[np.argmax(self.df[col])]
-                unidad = "m/s"
-            elif col == 'altura':
-                ax.plot(self.tiempo, self.df[col], lw=2, color=color)
-                max_val = self.df[col].max()
-                max_time = self.tiempo[np.argmax(self.df[col])]
-                unidad = "m"
-            else:
-                ax.plot(self.tiempo, self.df[col], lw=2, color=color)
-                max_val = self.df[col].max()
-                max_time = self.tiempo[np.argmax(self.df[col])]
-                unidad = ""
-        except KeyError:
-            ttk.Label(canvas_frame, text=f"Error: columna '{col}' no encontrada. Asegúrese de cargar los datos y calcular antes.", foreground='red').pack()
-            ttk.Button(canvas_frame, text="⬅ Volver al menú", command=self.create_main_menu, style=Config.button_style).pack(pady=(10,0))
-            return
+        fig = Figure(figsize=(6, 3), dpi=Config.graph_dpi)
+        ax = fig.add_subplot(111)
+        linea, = ax.plot([], [], lw=2, color=color)
+        puntos = ax.scatter([], [], color=color, s=10) if col == 'Fuerza_N' else None
         fig.subplots_adjust(left=0.12, right=0.98, top=0.92, bottom=0.14)
         ax.set_title(ylabel, fontsize=11)
         ax.set_xlabel("Tiempo (s)", fontsize=10)
@@ -321,21 +515,323 @@ class BancoPruebas:
         ax.tick_params(axis='both', labelsize=9)
         ax.grid(True)
         fig.tight_layout(pad=1.0)
-        self.graph_canvas = FigureCanvasTkAgg(fig, master=canvas_frame)
-        self.graph_canvas.draw()
-        self.graph_canvas.get_tk_widget().pack(fill=tk.NONE, expand=False, anchor="center")
+        canvas = FigureCanvasTkAgg(fig, master=canvas_frame)
+        # Barra de zoom/desplazamiento; al cambiar el eje X se vuelve a decimar la parte visible
+        toolbar = NavigationToolbar2Tk(canvas, canvas_frame, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(anchor="center")
+        canvas.get_tk_widget().pack(fill=tk.NONE, expand=False, anchor="center")
 
         # Label con el valor máximo alcanzado y unidad
-        ttk.Label(
+        label_max = ttk.Label(
             canvas_frame,
-            text=f"🔝 Máximo: {max_val:.2f} {unidad} en t={max_time:.2f} s",
             font=('Segoe UI', 12, 'bold'),
             foreground=color,
             background="#f8f9fa",
             padding=8
-        ).pack(pady=(10,0))
+        )
+        label_max.pack(pady=(10,0))
 
         ttk.Button(canvas_frame, text="⬅ Volver al menú", command=self.create_main_menu, style=Config.button_style).pack(pady=(10,0))
+        vista = {'frame': outer_frame, 'fig': fig, 'ax': ax, 'linea': linea, 'puntos': puntos,
+                 'canvas': canvas, 'toolbar': toolbar, 'label_max': label_max, 'clave': None,
+                 't': np.empty(0), 'y': np.empty(0)}
+        ax.callbacks.connect('xlim_changed', lambda ax: self.decimar_vista(vista))
+        return vista
+
+    def actualizar_vista_grafica(self, vista, col):
+        # Actualiza los datos de la figura existente en lugar de crear otra
+        y = self.df[col].to_numpy()
+        vista['t'], vista['y'] = self.tiempo, y
+        ax = vista['ax']
+        # Los límites se calculan con los datos completos; la línea solo lleva los decimados
+        ax.dataLim.update_from_data_xy(np.column_stack((self.tiempo, y)), ignore=True)
+        ax.set_autoscale_on(True)  # Un zoom previo lo desactiva y dejaría los límites viejos
+        ax.autoscale_view()
+        self.decimar_vista(vista)
+        vista['toolbar'].update()  # Reinicia el historial de zoom
+        i_max = np.argmax(y)
+        unidad = UNIDADES.get(col, "")
+        vista['label_max'].config(text=f"🔝 Máximo: {y[i_max]:.2f} {unidad} en t={self.tiempo[i_max]:.2f} s")
+        vista['canvas'].draw()
+        vista['clave'] = self._clave_calculos
+
+    def decimar_vista(self, vista):
+        # Solo se dibujan ~2 puntos por píxel de la parte visible (mínimo y máximo)
+        ax = vista['ax']
+        x0, x1 = ax.get_xlim()
+        t, y = decimar_ventana(vista['t'], vista['y'], x0, x1, ax.bbox.width)
+        vista['linea'].set_data(t, y)
+        if vista['puntos'] is not None:
+            visibles = np.searchsorted(vista['t'], x1) - np.searchsorted(vista['t'], x0)
+            marcar = visibles <= Config.max_puntos_marcados
+            vista['puntos'].set_offsets(np.column_stack((t, y)) if marcar else np.empty((0, 2)))
+
+    def mostrar_montecarlo(self):
+        from montecarlo import ejecutar_montecarlo, INCERTIDUMBRES
+        self.actualizar_masas()
+        self.calcular_datos()
+        self.clear_window()
+        frame = ttk.Frame(self.window, padding="30 20 30 20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current_view = frame
+
+        ttk.Label(frame, text="🎲 Incertidumbre por Monte Carlo", font=('Segoe UI', 16, 'bold')).pack(pady=(0,6))
+        inc = INCERTIDUMBRES
+        ttk.Label(frame, font=('Segoe UI', 9), foreground='gray', text=(
+            f"σ calibración {inc['factor_calibracion']*100:.1f} % · σ masa total {inc['masa_total']*1000:.0f} g · "
+            f"σ propelente {inc['masa_propelente']*1000:.0f} g · σ tiempo {inc['jitter_tiempo']*1000:.1f} ms · "
+            f"σ ruido {inc['ruido_fuerza']:.2f} N")).pack()
+        estado = ttk.Label(frame, text=f"Calculando {Config.montecarlo_corridas} corridas...",
+                           foreground="blue", font=Config.font)
+        estado.pack(pady=(4,8))
+        ttk.Button(frame, text="⬅ Volver al menú", command=self.create_main_menu,
+                   style=Config.button_style).pack(side=tk.BOTTOM, pady=8)
+
+        clave, datos = self._cache_montecarlo
+        if clave == self._clave_calculos:
+            self.dibujar_montecarlo(frame, estado, *datos)
+            return
+
+        # Se calcula en segundo plano (con un pool de procesos) para no bloquear la interfaz
+        resultado = {}
+        clave = self._clave_calculos
+        args = (self.tiempo, self.fuerza, self.masa_total_inicial, self.masa_propelente)
+
+        def calcular():
+            try:
+                resultado['datos'] = ejecutar_montecarlo(*args, n=Config.montecarlo_corridas,
+                                                         semilla=Config.montecarlo_semilla,
+                                                         modelo_masa=self.modelo_masa)
+            except Exception as e:
+                resultado['error'] = e
+
+        def esperar():
+            if not resultado:
+                self.window.after(100, esperar)
+                return
+            if 'error' in resultado:
+                if frame.winfo_exists():
+                    estado.config(text=f"Error en Monte Carlo: {resultado['error']}", foreground='red')
+                return
+            self._cache_montecarlo = (clave, resultado['datos'])
+            if frame.winfo_exists():
+                self.dibujar_montecarlo(frame, estado, *resultado['datos'])
+
+        threading.Thread(target=calcular, daemon=True).start()
+        self.window.after(100, esperar)
+
+    def dibujar_montecarlo(self, frame, estado, muestras, resumen):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        estado.config(text=f"{Config.montecarlo_corridas} corridas · intervalos de confianza del 95 %")
+        metricas = [
+            ('apogeo', "Apogeo estimado", "m"),
+            ('Isp', "Isp", "s"),
+            ('impulso_total', "Impulso total", "N·s"),
+            ('aceleracion_max', "Aceleración máxima", "m/s²")
+        ]
+        tabla = ttk.Frame(frame)
+        tabla.pack(fill=tk.X, pady=(0,8))
+        fig = Figure(figsize=(7, 4), dpi=Config.graph_dpi)
+        for i, (clave, nombre, unidad) in enumerate(metricas):
+            r = resumen[clave]
+            p_inf, p_med, p_sup = r['percentiles'].values()
+            ttk.Label(tabla, text=f"• {nombre}:", font=Config.font).grid(row=i, column=0, sticky="w")
+            ttk.Label(tabla, font=('Segoe UI', 11, 'bold'), foreground=Config.primary_color,
+                      text=f"{r['media']:.2f} ± {r['desv']:.2f} {unidad}   IC95 [{p_inf:.2f}, {p_sup:.2f}]"
+                      ).grid(row=i, column=1, sticky="e", padx=(10,0))
+            ax = fig.add_subplot(2, 2, i + 1)
+            ax.hist(muestras[clave], bins=60, color=Config.primary_color, alpha=0.8)
+            for x in (p_inf, p_sup):
+                ax.axvline(x, color='red', ls='--', lw=1)
+            ax.axvline(p_med, color='black', lw=1)
+            ax.set_title(f"{nombre} ({unidad})", fontsize=9)
+            ax.tick_params(axis='both', labelsize=8)
+        tabla.columnconfigure(1, weight=1)
+        fig.tight_layout(pad=0.8)
+        canvas = FigureCanvasTkAgg(fig, master=frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def mostrar_campana(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from campana import METRICAS as METRICAS_CAMPANA, OPERADORES
+        self.clear_window()
+        frame = ttk.Frame(self.window, padding="30 20 30 20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current_view = frame
+        ttk.Label(frame, text="🗂 Campaña de pruebas", font=('Segoe UI', 16, 'bold')).pack(pady=(0,10))
+
+        # Filtro: métrica, operador y valor
+        filtro = ttk.Frame(frame)
+        filtro.pack(fill=tk.X, pady=(0,6))
+        metrica_var = tk.StringVar(value='impulso_total')
+        operador_var = tk.StringVar(value='>')
+        valor_var = tk.StringVar()
+        ttk.Combobox(filtro, textvariable=metrica_var, values=METRICAS_CAMPANA, state="readonly",
+                     width=20).pack(side=tk.LEFT, padx=2)
+        ttk.Combobox(filtro, textvariable=operador_var, values=OPERADORES, state="readonly",
+                     width=4).pack(side=tk.LEFT, padx=2)
+        ttk.Entry(filtro, textvariable=valor_var, width=10).pack(side=tk.LEFT, padx=2)
+
+        columnas = ('archivo', 'fecha', 'empuje_max', 'impulso_total', 'tiempo_quemado', 'Isp', 'apogeo')
+        tabla = ttk.Treeview(frame, columns=columnas, show='headings', selectmode='extended', height=8)
+        for col in columnas:
+            tabla.heading(col, text=col)
+            tabla.column(col, width=150 if col in ('archivo', 'fecha') else 90, anchor='e')
+        tabla.pack(fill=tk.X)
+
+        graf_frame = ttk.Frame(frame)
+        graf_frame.pack(fill=tk.BOTH, expand=True, pady=(8,0))
+        fig = Figure(figsize=(6, 3), dpi=Config.graph_dpi)
+        ax = fig.add_subplot(111)
+        canvas = FigureCanvasTkAgg(fig, master=graf_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        estado = ttk.Label(frame, text="", foreground="blue", font=Config.font)
+        rutas = {}
+
+        def cargar_tabla(condiciones=()):
+            tabla.delete(*tabla.get_children())
+            try:
+                corridas = self.obtener_campana().buscar(*condiciones)
+            except Exception as e:
+                estado.config(text=f"Error en la consulta: {e}", foreground='red')
+                return
+            for c in corridas:
+                rutas[c['id']] = c['ruta']
+                fila = [os.path.basename(c['ruta']), c['fecha']] + [
+                    f"{c[col]:.2f}" if c[col] is not None else "" for col in columnas[2:]]
+                tabla.insert('', tk.END, iid=str(c['id']), values=fila)
+            estado.config(text=f"{len(corridas)} corridas", foreground='blue')
+
+        def filtrar():
+            try:
+                valor = float(valor_var.get())
+            except ValueError:
+                cargar_tabla()
+                return
+            cargar_tabla([(metrica_var.get(), operador_var.get(), valor)])
+
+        def superponer():
+            ids = [int(i) for i in tabla.selection()]
+            ax.clear()
+            # Trazas reducidas guardadas en la base de datos: no se releen los archivos
+            for id_corrida, (t, f) in self.obtener_campana().trazas(ids).items():
+                ax.plot(t, f, lw=1.2, label=os.path.basename(rutas.get(id_corrida, str(id_corrida))))
+            ax.set_xlabel("Tiempo desde la ignición (s)", fontsize=10)
+            ax.set_ylabel("Empuje (N)", fontsize=10)
+            ax.tick_params(axis='both', labelsize=9)
+            ax.grid(True)
+            if 0 < len(ids) <= 10:
+                ax.legend(fontsize=8)
+            fig.tight_layout(pad=1.0)
+            canvas.draw()
+
+        ttk.Button(filtro, text="Filtrar", command=filtrar).pack(side=tk.LEFT, padx=2)
+        ttk.Button(filtro, text="Todas", command=cargar_tabla).pack(side=tk.LEFT, padx=2)
+        ttk.Button(filtro, text="Superponer seleccionadas", command=superponer).pack(side=tk.RIGHT, padx=2)
+        estado.pack(pady=(4,0))
+        ttk.Button(frame, text="⬅ Volver al menú", command=self.create_main_menu,
+                   style=Config.button_style).pack(pady=8)
+        cargar_tabla()
+
+    def mostrar_exportar_motor(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from scipy.integrate import trapezoid
+        from motor import exportar_motor, curva_motor, PUNTOS_ENG, PUNTOS_RSE
+        self.clear_window()
+        frame = ttk.Frame(self.window, padding="30 20 30 20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current_view = frame
+        ttk.Label(frame, text="💾 Exportar archivo de motor", font=('Segoe UI', 16, 'bold')).pack(pady=(0,10))
+
+        # Formulario; los valores se recuerdan entre visitas
+        nombre_base = os.path.splitext(os.path.basename(self.archivo_cargado or "motor"))[0]
+        opciones = {'nombre': nombre_base, 'fabricante': 'BancoPruebas', 'diametro_mm': Config.motor_diametro_mm,
+                    'largo_mm': Config.motor_largo_mm, 'masa_total': self.masa_propelente, 'retardos': 'P',
+                    'max_puntos': ''}
+        opciones.update(self.opciones_motor)
+        campos = [
+            ('nombre', "Designación del motor:"),
+            ('fabricante', "Fabricante:"),
+            ('diametro_mm', "Diámetro del motor (mm):"),
+            ('largo_mm', "Longitud del motor (mm):"),
+            ('masa_total', "Masa del motor cargado (kg):"),
+            ('retardos', "Retardos (p. ej. 0-5-7, P sin carga):"),
+            ('max_puntos', f"Máximo de puntos (vacío: {PUNTOS_ENG} en .eng, {PUNTOS_RSE} en .rse):")
+        ]
+        form = ttk.Frame(frame)
+        form.pack(fill=tk.X, pady=(0,8))
+        form.columnconfigure(1, weight=1)
+        variables = {}
+        for fila, (clave, texto) in enumerate(campos):
+            ttk.Label(form, text=texto, font=Config.font).grid(row=fila, column=0, sticky="w", pady=3)
+            variables[clave] = tk.StringVar(value=str(opciones[clave]))
+            ttk.Entry(form, textvariable=variables[clave], font=Config.font).grid(row=fila, column=1, sticky="ew",
+                                                                                 padx=8, pady=3)
+
+        graf_frame = ttk.Frame(frame)
+        graf_frame.pack(fill=tk.BOTH, expand=True, pady=(8,0))
+        fig = Figure(figsize=(6, 3), dpi=Config.graph_dpi)
+        ax = fig.add_subplot(111)
+        canvas = FigureCanvasTkAgg(fig, master=graf_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        estado = ttk.Label(frame, text="", foreground="blue", font=Config.font)
+
+        def leer_opciones():
+            valores = {k: v.get().strip() for k, v in variables.items()}
+            self.opciones_motor = dict(valores)
+            resultado = {'nombre': valores['nombre'] or nombre_base, 'fabricante': valores['fabricante'] or 'BancoPruebas',
+                         'diametro_mm': float(valores['diametro_mm']), 'largo_mm': float(valores['largo_mm']),
+                         'masa_propelente': self.masa_propelente, 'masa_total': float(valores['masa_total']),
+                         'retardos': valores['retardos'] or 'P'}
+            if valores['max_puntos']:
+                resultado['max_puntos'] = int(valores['max_puntos'])
+            return resultado
+
+        def vista_previa(t, f):
+            # Curva medida frente a la curva reducida que se exporta
+            ax.clear()
+            ax.plot(self.tiempo - self.tiempo[0] + (t[0] if len(t) else 0), self.fuerza, lw=1, color='lightgray',
+                    label="Medida")
+            ax.plot(t, f, 'o-', lw=1.5, ms=3, color=GRAPH_COLORS['Fuerza_N'], label=f"Exportada ({len(t)} puntos)")
+            ax.set_xlabel("Tiempo desde la ignición (s)", fontsize=10)
+            ax.set_ylabel("Empuje (N)", fontsize=10)
+            ax.tick_params(axis='both', labelsize=9)
+            ax.grid(True)
+            ax.legend(fontsize=8)
+            fig.tight_layout(pad=1.0)
+            canvas.draw()
+
+        def guardar():
+            try:
+                opciones = leer_opciones()
+            except ValueError as e:
+                estado.config(text=f"Valor no válido: {e}", foreground='red')
+                return
+            ruta = filedialog.asksaveasfilename(defaultextension=".eng", initialfile=f"{opciones['nombre']}.eng",
+                                                filetypes=[("RASP", "*.eng"), ("RockSim", "*.rse")])
+            if not ruta:
+                return
+            try:
+                t, f = exportar_motor(ruta, self.tiempo, self.fuerza, **opciones)
+            except Exception as e:
+                estado.config(text=f"Error al exportar: {e}", foreground='red')
+                return
+            vista_previa(t, f)
+            impulso = trapezoid(f, t)
+            error = 100 * (impulso / self.calculos['impulso_total'] - 1) if self.calculos['impulso_total'] else 0.0
+            estado.config(text=f"Guardado {os.path.basename(ruta)}: {len(t)} puntos, impulso {impulso:.2f} N·s "
+                               f"({error:+.2f} % respecto a la medida)", foreground='green')
+
+        ttk.Button(frame, text="Guardar archivo de motor", command=guardar, style=Config.button_style).pack(pady=(8,0))
+        estado.pack(pady=(4,0))
+        ttk.Button(frame, text="⬅ Volver a resultados", command=self.mostrar_resultados,
+                   style=Config.button_style).pack(pady=8)
+        vista_previa(*curva_motor(self.tiempo, self.fuerza, PUNTOS_ENG))
 
     def on_resize(self, event):
         # Redibuja el gráfico si está visible y en modo gráfico
@@ -354,6 +850,14 @@ class BancoPruebas:
         self.window.geometry(f"{width}x{height}+{x}+{y}")
 
     def mostrar_grabacion_serial(self):
+        import serial.tools.list_ports
+        from acumulador import AcumuladorEmpuje
+        from adquisicion import Adquisidor, Dispositivo, archivo_por_dispositivo
+        from fragmentos import grabacion_interrumpida
+        from grafica_vivo import GraficaEnVivo
+        if self.acumulador is None:
+            self.acumulador = AcumuladorEmpuje(self.masa_propelente)
+        self.actualizar_masas()
         self.clear_window()
         frame = ttk.Frame(self.window, padding="30 20 30 20")
         frame.pack(fill=tk.BOTH, expand=True)
@@ -362,16 +866,32 @@ class BancoPruebas:
         ttk.Label(frame, text="Grabar datos Arduino", font=('Segoe UI', 16, 'bold')).pack(pady=(0,10))
 
         ports = [port.device for port in serial.tools.list_ports.comports()]
-        port_var = tk.StringVar(value=ports[0] if ports else "")
-        ttk.Label(frame, text="Puerto COM:", font=Config.font).pack(anchor="w", pady=(0,2))
-        port_menu = ttk.Combobox(frame, textvariable=port_var, values=ports, state="readonly", font=Config.font)
-        port_menu.pack(fill=tk.X, pady=(0,8))
+        ttk.Label(frame, text="Puertos COM (Ctrl+clic para grabar varios a la vez; el primero es el empuje):",
+                  font=Config.font).pack(anchor="w", pady=(0,2))
+        port_list = tk.Listbox(frame, selectmode=tk.EXTENDED, height=min(max(len(ports), 1), 4),
+                               exportselection=False, font=Config.font)
+        for port in ports:
+            port_list.insert(tk.END, port)
+        for i, port in enumerate(ports):
+            if port in self.serial_ports or (not self.serial_ports and i == 0):
+                port_list.selection_set(i)
+        port_list.pack(fill=tk.X, pady=(0,8))
+
+        ttk.Label(frame, text="Formato de transmisión:", font=Config.font).pack(anchor="w", pady=(0,2))
+        modo_txt = next(k for k, v in MODOS_SERIAL_UI.items() if v == self.serial_modo)
+        modo_var = tk.StringVar(value=modo_txt)
+        ttk.Combobox(frame, textvariable=modo_var, values=list(MODOS_SERIAL_UI), state="readonly",
+                     font=Config.font).pack(fill=tk.X, pady=(0,8))
 
-        ttk.Label(frame, text="Archivo destino:", font=Config.font).pack(anchor="w", pady=(0,2))
+        ttk.Label(frame, text="Archivo destino (.csv o .bpm binario):", font=Config.font).pack(anchor="w", pady=(0,2))
         file_var = tk.StringVar(value=self.serial_filename)
         file_entry = ttk.Entry(frame, textvariable=file_var, font=Config.font)
         file_entry.pack(fill=tk.X, pady=(0,8))
 
+        reanudar_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(frame, text="Continuar la grabación si quedó interrumpida en ese archivo",
+                        variable=reanudar_var).pack(anchor="w", pady=(0,8))
+
         status_label = ttk.Label(frame, text="", foreground="blue", font=Config.font)
         status_label.pack(pady=(0,8))
 
@@ -383,59 +903,176 @@ class BancoPruebas:
         btn_detener.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=4)
 
         def start_serial():
-            self.serial_port = port_var.get()
+            self.serial_ports = [ports[i] for i in port_list.curselection()]
+            if not self.serial_ports:
+                status_label.config(text="Seleccione al menos un puerto.", foreground="red")
+                return
             self.serial_filename = file_var.get()
-            self.serial_stop_event.clear()
-            self.serial_thread = threading.Thread(target=self.grabar_serial_thread, daemon=True)
-            self.serial_thread.start()
-            status_label.config(text=f"Grabando en {self.serial_filename} desde {self.serial_port}...")
+            self.serial_modo = MODOS_SERIAL_UI.get(modo_var.get(), 'ascii')
+            self.buffer_vivo.reiniciar()
+            self._leidas_vivo = 0
+            self._frecuencia_vivo = None
+            self.acumulador.reiniciar()
+            self.acumulador.masa_propelente = self.masa_propelente
+            if self.grafica_vivo:
+                self.grafica_vivo.reiniciar()
+            varios = len(self.serial_ports) > 1
+            dispositivos = [Dispositivo(port, self.serial_modo,
+                                        archivo_por_dispositivo(self.serial_filename, port, varios))
+                            for port in self.serial_ports]
+            reanudar = reanudar_var.get()
+            self._archivo_grabacion = dispositivos[0].archivo
+            interrumpidas = [d for d in dispositivos if grabacion_interrumpida(d.archivo)]
+            self.medidor.resumen()  # Descarta lo medido antes de esta grabación
+            self.adquisidor = Adquisidor(dispositivos, self.recibir_muestras, self.cola_log.append,
+                                         muestras_por_fragmento=Config.muestras_por_fragmento,
+                                         reanudar=reanudar,
+                                         medidor=self.medidor if self.mostrar_tiempos else None)
+            self.adquisidor.iniciar()
+            destinos = ", ".join(os.path.basename(d.archivo) for d in dispositivos)
+            accion = "Continuando" if reanudar and interrumpidas else "Grabando"
+            status_label.config(text=f"{accion} en {destinos} desde {', '.join(self.serial_ports)}...",
+                                foreground="blue")
             btn_grabar.config(state=tk.DISABLED)
             btn_detener.config(state=tk.NORMAL)
 
-        def stop_serial():
-            self.serial_stop_event.set()
-            status_label.config(text="Grabación detenida.")
+        def grabacion_terminada():
+            # El archivo ya está reensamblado: se indexa en la campaña con las masas actuales
+            try:
+                self.registrar_grabacion(self._archivo_grabacion)
+                status_label.config(text="Grabación detenida y registrada en la campaña.")
+            except Exception as e:
+                status_label.config(text=f"Grabación detenida (no se registró en la campaña: {e}).")
             btn_grabar.config(state=tk.NORMAL)
+
+        def stop_serial():
+            if self.adquisidor:
+                self.adquisidor.detener()
+            # detener() no bloquea: el hilo aún cierra el puerto y reensambla el archivo, así que
+            # no se puede volver a grabar hasta que refrescar_grabacion vea que terminó
+            status_label.config(text="Deteniendo: guardando el archivo...")
             btn_detener.config(state=tk.DISABLED)
+            self._al_terminar_grabacion = grabacion_terminada
 
         btn_grabar.config(command=start_serial)
         btn_detener.config(command=stop_serial)
+        if self.adquisidor and self.adquisidor.activo():
+            # Se volvió a esta pantalla con una grabación en marcha o terminando
+            btn_grabar.config(state=tk.DISABLED)
+            btn_detener.config(state=tk.NORMAL)
+            if self._al_terminar_grabacion:
+                stop_serial()
+
+        # Resultados acumulados durante la grabación
+        self.resultados_vivo_label = ttk.Label(frame, text=self.texto_resultados_vivo(),
+                                               font=('Consolas', 11, 'bold'), foreground=Config.primary_color)
+        self.resultados_vivo_label.pack(anchor="w", padx=4, pady=(0,4))
+
+        # Panel opcional con los tiempos de cada etapa de la grabación
+        tiempos_var = tk.BooleanVar(value=self.mostrar_tiempos)
+        tiempos_label = ttk.Label(frame, text="", font=('Consolas', 9), justify=tk.LEFT)
+
+        def alternar_tiempos():
+            self.mostrar_tiempos = tiempos_var.get()
+            if self.adquisidor:
+                self.adquisidor.medir(self.medidor if self.mostrar_tiempos else None)
+            if self.mostrar_tiempos:
+                tiempos_label.pack(anchor="w", padx=4, pady=(0,4), after=check_tiempos)
+                self.tiempos_label = tiempos_label
+            else:
+                tiempos_label.pack_forget()
+                self.tiempos_label = None
+
+        check_tiempos = ttk.Checkbutton(frame, text="Mostrar tiempos por etapa", variable=tiempos_var,
+                                        command=alternar_tiempos)
+        check_tiempos.pack(anchor="w", padx=4)
+        alternar_tiempos()
+
+        # Gráfica de empuje en vivo
+        graf_frame = ttk.Frame(frame)
+        graf_frame.pack(fill=tk.BOTH, expand=True, padx=4, pady=(0,8))
+        self.grafica_vivo = GraficaEnVivo(graf_frame, Config.ventana_grabacion_s,
+                                          GRAPH_COLORS['Fuerza_N'], Config.graph_dpi)
 
         # Área para mostrar la grabación serial en tiempo real
-        self.serial_text = tk.Text(frame, height=10, state=tk.DISABLED, font=('Consolas', 10))
-        self.serial_text.pack(fill=tk.BOTH, padx=4, pady=(0,8), expand=True)
+        self.serial_text = tk.Text(frame, height=6, state=tk.DISABLED, font=('Consolas', 10))
+        self.serial_text.pack(fill=tk.X, padx=4, pady=(0,8))
 
         ttk.Button(frame, text="⬅ Volver al menú", command=self.create_main_menu, style=Config.button_style).pack(pady=8)
 
-    def grabar_serial_thread(self):
+    def recibir_muestras(self, indice, t_ms, kg):
+        # Llamado desde el hilo de adquisición; el primer dispositivo es la celda de empuje
+        if indice == 0:
+            from analisis import G
+            t_s, fuerza_n = t_ms / 1000.0, kg.astype(float) * G
+            self.buffer_vivo.escribir(t_s, fuerza_n)
+            self.acumulador.agregar_bloque(t_s, fuerza_n)
+        prefijo = f"[{self.adquisidor.dispositivos[indice].nombre}] " if len(self.adquisidor.dispositivos) > 1 else ""
+        self.cola_log.append(prefijo + formatear_csv(t_ms, kg).replace("\n", "\n" + prefijo))
+
+    def refrescar_grabacion(self):
+        # Temporizador de la interfaz: vacía de golpe lo que dejó la adquisición
         try:
-            ser = serial.Serial(self.serial_port, self.serial_baud, timeout=2)
-            time.sleep(2)
-            with open(self.serial_filename, "w") as f:
-                while not self.serial_stop_event.is_set():
-                    linea = ser.readline().decode(errors="ignore").strip()
-                    if linea:
-                        self.window.after(0, self.agregar_linea_serial, linea)
-                        f.write(linea + "\n")
-            ser.close()
-        except Exception as e:
-            self.window.after(0, self.agregar_linea_serial, f"Error: {e}")
+            if self._al_terminar_grabacion and not self.adquisidor.activo():
+                al_terminar, self._al_terminar_grabacion = self._al_terminar_grabacion, None
+                al_terminar()
+            if self.cola_log:
+                lineas = []
+                while self.cola_log:
+                    lineas.append(self.cola_log.popleft())
+                self.agregar_linea_serial("\n".join(lineas))
+            if self.grafica_vivo and self.buffer_vivo.escritas != self._leidas_vivo:
+                t0 = time.perf_counter()
+                nuevas = self.buffer_vivo.escritas - self._leidas_vivo
+                self._leidas_vivo = self.buffer_vivo.escritas
+                t, f = self.buffer_vivo.ultimos(self.muestras_visibles_vivo())
+                if len(t) > 1 and t[-1] > t[0]:
+                    self._frecuencia_vivo = (len(t) - 1) / (t[-1] - t[0])
+                self.grafica_vivo.actualizar(t, f)
+                if self.resultados_vivo_label:
+                    self.resultados_vivo_label.config(text=self.texto_resultados_vivo())
+                if self.tiempos_label:
+                    self.medidor.registrar('dibujar', time.perf_counter() - t0, nuevas)
+            if self.tiempos_label and time.perf_counter() - self._ultimo_panel_tiempos >= Config.intervalo_tiempos_s:
+                self._ultimo_panel_tiempos = time.perf_counter()
+                self.tiempos_label.config(text=MedidorEtapas.texto(self.medidor.resumen()))
+        except tk.TclError:
+            pass  # La vista se destruyó entre dos refrescos
+        self.window.after(int(1000 / Config.fps_grabacion), self.refrescar_grabacion)
+
+    def muestras_visibles_vivo(self):
+        # Solo se copia la ventana visible (con holgura), estimada con la frecuencia del último
+        # cuadro; así la lectura queda lejos de las muestras que el productor está pisando
+        if not self._frecuencia_vivo:
+            return self.buffer_vivo.maximo_lectura
+        return int(1.5 * Config.ventana_grabacion_s * self._frecuencia_vivo) + 256
+
+    def texto_resultados_vivo(self):
+        acc = self.acumulador
+        estado = "🔥 Quemando" if acc.quemando else "Sin empuje"
+        return (f"{estado} | Empuje máx: {acc.empuje_max:.2f} N | Impulso: {acc.impulso_total:.2f} N·s | "
+                f"Quemado: {acc.tiempo_quemado:.3f} s | Isp: {acc.Isp:.2f} s")
 
     def agregar_linea_serial(self, linea):
-        if hasattr(self, "serial_text"):
+        if hasattr(self, "serial_text") and self.serial_text.winfo_exists():
             self.serial_text.config(state=tk.NORMAL)
             self.serial_text.insert(tk.END, linea + "\n")
+            # Solo se conservan las últimas líneas para que la memoria no crezca en pruebas largas
+            sobrantes = int(self.serial_text.index('end-1c').split('.')[0]) - Config.max_lineas_log
+            if sobrantes > 0:
+                self.serial_text.delete('1.0', f'{sobrantes + 1}.0')
             self.serial_text.see(tk.END)
             self.serial_text.config(state=tk.DISABLED)
 
 # ===== Ejecutar =====
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necesario para el pool de procesos en el .exe
     if 'win' in sys.platform:
         try:
             ctypes.windll.shcore.SetProcessDpiAwareness(1)
         except:
             pass
     try:
-        BancoPruebas()
+        BancoPruebas().ejecutar()
     except KeyboardInterrupt:
         print("Programa detenido por el usuario (KeyboardInterrupt).")
\ No newline at end of file
@@ -0,0 +1,103 @@
+# ===== Cálculo incremental durante la grabación =====
+# Mantiene impulso, empuje máximo y tiempo de quemado a medida que llegan las muestras,
+# con coste constante por muestra. Usa el mismo criterio que analisis.preparar_datos
+# (solo cuentan las muestras por encima de UMBRAL_FUERZA_N), así que al terminar la
+# grabación coincide con calcular_resultados sobre el archivo grabado.
+import numpy as np
+
+from analisis import G, UMBRAL_FUERZA_N
+
+
+class AcumuladorEmpuje:
+    """Acumula resultados del motor muestra a muestra o bloque a bloque.
+
+    El estado 'quemando' usa histéresis: se activa cuando el empuje supera
+    'umbral_encendido' y se desactiva cuando baja de 'umbral_apagado'.
+    """
+
+    def __init__(self, masa_propelente=0.0, umbral=UMBRAL_FUERZA_N,
+                 umbral_encendido=2.0, umbral_apagado=UMBRAL_FUERZA_N):
+        self.masa_propelente = masa_propelente
+        self.umbral = umbral
+        self.umbral_encendido = umbral_encendido
+        self.umbral_apagado = umbral_apagado
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.muestras = 0
+        self.impulso_total = 0.0
+        self.empuje_max = 0.0
+        self.t_empuje_max = None
+        self.t_inicio = None
+        self.t_fin = None
+        self.quemando = False
+        self.t_ignicion = None
+        self.t_apagado = None
+        self._t_prev = None
+        self._f_prev = None
+
+    def agregar_bloque(self, t, f):
+        """Añade un bloque de muestras ordenadas por tiempo (t en s, f en N)."""
+        t = np.asarray(t, dtype=float)
+        f = np.asarray(f, dtype=float)
+        if len(t) == 0:
+            return
+        self._actualizar_estado(t, f)
+
+        validas = f > self.umbral
+        t, f = t[validas], f[validas]
+        if len(t) == 0:
+            return
+        self.muestras += len(t)
+        if self._t_prev is None:
+            self.t_inicio = t[0]
+        else:
+            t = np.concatenate(([self._t_prev], t))
+            f = np.concatenate(([self._f_prev], f))
+        if len(t) > 1:
+            self.impulso_total += float(np.dot(f[1:] + f[:-1], np.diff(t))) / 2
+        i_max = int(np.argmax(f))
+        if f[i_max] > self.empuje_max:
+            self.empuje_max = float(f[i_max])
+            self.t_empuje_max = float(t[i_max])
+        self._t_prev, self._f_prev = t[-1], f[-1]
+        self.t_fin = t[-1]
+
+    def _actualizar_estado(self, t, f):
+        # Histéresis vectorizada: solo importan las muestras que cruzan algún umbral
+        encendido = f > self.umbral_encendido
+        eventos = np.flatnonzero(encendido | (f < self.umbral_apagado))
+        if len(eventos) == 0:
+            return
+        tipos = encendido[eventos]
+        previos = np.concatenate(([self.quemando], tipos[:-1]))
+        cambios = eventos[tipos != previos]
+        if len(cambios) == 0:
+            return
+        for i in cambios:
+            if encendido[i]:
+                if self.t_ignicion is None:
+                    self.t_ignicion = float(t[i])
+            else:
+                self.t_apagado = float(t[i])
+        self.quemando = bool(encendido[cambios[-1]])
+
+    @property
+    def tiempo_quemado(self):
+        if self.t_inicio is None:
+            return 0.0
+        return float(self.t_fin - self.t_inicio)
+
+    @property
+    def Isp(self):
+        return self.impulso_total / (self.masa_propelente * G) if self.masa_propelente > 0 else 0
+
+    def resultados(self):
+        """Mismas claves que calcular_resultados para los valores que se pueden acumular."""
+        return {
+            'empuje_max': self.empuje_max,
+            'impulso_total': self.impulso_total,
+            'tiempo_quemado': self.tiempo_quemado,
+            'masa_propelente': self.masa_propelente,
+            'Isp': self.Isp
+        }
@@ -0,0 +1,276 @@
+# ===== Adquisición serie asíncrona de varios dispositivos =====
+# Un bucle asyncio en un hilo propio atiende todos los puertos a la vez (por ejemplo la
+# celda de empuje y un transductor de presión, o dos bancos). Las lecturas bloqueantes de
+# pyserial se hacen en el executor con un timeout corto, así que detener la grabación
+# responde en décimas de segundo sin esperar a readline.
+# Todas las muestras se pasan a un reloj común del host con un RelojDispositivo por
+# dispositivo, que sigue el desfase y la deriva del cristal del Arduino durante la grabación.
+# La escritura a disco (fragmentos rotativos, ver fragmentos.py) se hace en un hilo aparte
+# por dispositivo, así que ni el volcado ni el fsync retrasan la lectura del puerto.
+import asyncio
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import serial
+
+from protocolo_serial import BAUDIOS, crear_lector
+from fragmentos import EscritorFragmentado, MUESTRAS_POR_FRAGMENTO
+
+TIMEOUT_LECTURA = 0.05   # s; cota del tiempo de respuesta al detener
+
+
+class Dispositivo:
+    def __init__(self, puerto, modo='ascii', archivo=None, nombre=None):
+        self.puerto = puerto
+        self.modo = modo
+        self.archivo = archivo
+        self.nombre = nombre or puerto
+
+
+def archivo_por_dispositivo(archivo, puerto, varios):
+    """Con varios dispositivos, añade el puerto al nombre: empuje.csv -> empuje_COM3.csv."""
+    if not varios:
+        return archivo
+    base, ext = os.path.splitext(archivo)
+    return f"{base}_{re.sub(r'[^A-Za-z0-9]+', '', puerto)}{ext}"
+
+
+class RelojDispositivo:
+    """Pasa el tiempo del dispositivo (ms) al reloj del host (ms desde el inicio).
+
+    Cada bloque aporta la diferencia llegada - t_dev de su última muestra: el desfase real
+    más la latencia del puerto y del planificador, que solo puede sumar. Por eso se guarda
+    el mínimo de cada tramo de 'tramo_ms' (la llegada más rápida) y se ajusta una recta a los
+    últimos 'tramos' mínimos: la ordenada es el desfase y la pendiente la deriva del cristal
+    (de 10 a 100 ppm en un Arduino, de 36 a 360 ms por hora). Con menos de dos tramos
+    cerrados se usa el mínimo acumulado.
+    Error restante: la latencia mínima de cada tramo (1-2 ms con USB-serie, más con el
+    sistema cargado) y el ruido del ajuste, del orden de 1 ms; el reloj del host es
+    perf_counter, que no salta con los ajustes de hora del sistema.
+    """
+
+    def __init__(self, tramo_ms=1000.0, tramos=60):
+        self.tramo_ms = tramo_ms
+        self.tramos = tramos
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._minimos = deque(maxlen=self.tramos)  # (t_dev, desfase) de cada tramo cerrado
+        self._tramo = None                         # [inicio, t_dev, desfase] del tramo en curso
+        self._minimo = np.inf
+        self._recta = None                         # (pendiente, ordenada, t_dev de referencia)
+        self._ultimo_t = -np.inf
+
+    def observar(self, t_dev_ms, llegada_ms):
+        t_dev_ms = float(t_dev_ms)
+        if t_dev_ms < self._ultimo_t:
+            self._reiniciar()  # El dispositivo se reinició y su reloj volvió a cero
+        self._ultimo_t = t_dev_ms
+        desfase = llegada_ms - t_dev_ms
+        self._minimo = min(self._minimo, desfase)
+        tramo = self._tramo
+        if tramo is None or t_dev_ms - tramo[0] >= self.tramo_ms:
+            if tramo is not None:
+                self._minimos.append((tramo[1], tramo[2]))
+                self._ajustar()
+            self._tramo = [t_dev_ms, t_dev_ms, desfase]
+        elif desfase < tramo[2]:
+            tramo[1], tramo[2] = t_dev_ms, desfase
+
+    def _ajustar(self):
+        if len(self._minimos) < 2:
+            return
+        x, y = np.array(self._minimos).T
+        referencia = x[-1]  # Centrado: la recta se evalúa cerca de los datos
+        pendiente, ordenada = np.polyfit(x - referencia, y, 1)
+        self._recta = (pendiente, ordenada, referencia)
+
+    def convertir(self, t_dev_ms):
+        if self._recta is None:
+            return t_dev_ms + self._minimo
+        pendiente, ordenada, referencia = self._recta
+        return t_dev_ms + ordenada + pendiente * (t_dev_ms - referencia)
+
+
+class EscritorBuffer:
+    """Escribe en un hilo propio: escribir() solo encola el bloque y vuelve al momento.
+
+    El hilo junta los bloques y los vuelca al escritor cuando hay 'max_muestras' pendientes
+    o han pasado 'intervalo_fsync' s, con fsync en cada volcado. Un error de disco queda en
+    'error' para que lo recoja quien lee el puerto.
+    """
+
+    def __init__(self, escritor, max_muestras=4096, intervalo_fsync=1.0, medidor=None):
+        self.escritor = escritor
+        self.max_muestras = max_muestras
+        self.intervalo_fsync = intervalo_fsync
+        self.medidor = medidor
+        self.error = None
+        self._cola = queue.SimpleQueue()
+        self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+        self._hilo.start()
+
+    def escribir(self, t_ms, kg):
+        self._cola.put((t_ms, kg))
+
+    def cerrar(self):
+        self._cola.put(None)
+        self._hilo.join()
+
+    def _volcar(self, t, f):
+        t0 = time.perf_counter()
+        if t:
+            self.escritor.escribir(np.concatenate(t), np.concatenate(f))
+        self.escritor.sincronizar()
+        medidor = self.medidor
+        if medidor is not None:
+            medidor.registrar('disco', time.perf_counter() - t0, sum(map(len, t)))
+
+    def _trabajar(self):
+        t, f = [], []
+        pendientes = 0
+        ultimo_fsync = time.monotonic()
+        try:
+            while True:
+                espera = max(0.0, ultimo_fsync + self.intervalo_fsync - time.monotonic())
+                try:
+                    bloque = self._cola.get(timeout=espera)
+                except queue.Empty:
+                    bloque = ()
+                if bloque is None:
+                    break
+                if bloque:
+                    t.append(bloque[0])
+                    f.append(bloque[1])
+                    pendientes += len(bloque[0])
+                if pendientes >= self.max_muestras or time.monotonic() - ultimo_fsync >= self.intervalo_fsync:
+                    self._volcar(t, f)
+                    t, f = [], []
+                    pendientes = 0
+                    ultimo_fsync = time.monotonic()
+            self._volcar(t, f)
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                self.escritor.cerrar()
+            except Exception as e:
+                self.error = self.error or e
+
+
+class Adquisidor:
+    """Graba varios dispositivos a la vez.
+
+    'al_recibir(indice, t_ms, kg)' recibe cada bloque con el tiempo ya en el reloj del host
+    (ms desde el inicio) y 'al_mensaje(texto)' las líneas de estado; ambos se llaman desde
+    el hilo de adquisición.
+    Con 'reanudar', cada dispositivo continúa su grabación interrumpida si la hay.
+    Con un 'medidor' (instrumentacion.MedidorEtapas) se registran los tiempos de las etapas
+    'decodificar', 'entregar' y 'disco'.
+    """
+
+    def __init__(self, dispositivos, al_recibir=None, al_mensaje=None, intervalo_fsync=1.0,
+                 muestras_por_fragmento=MUESTRAS_POR_FRAGMENTO, reanudar=False, medidor=None):
+        self.dispositivos = list(dispositivos)
+        self.al_recibir = al_recibir or (lambda i, t, f: None)
+        self.al_mensaje = al_mensaje or (lambda texto: None)
+        self.intervalo_fsync = intervalo_fsync
+        self.muestras_por_fragmento = muestras_por_fragmento
+        self.reanudar = reanudar
+        self.medidor = medidor
+        self._escritores = []
+        self._hilo = None
+        self._loop = None
+        self._parar = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=lambda: asyncio.run(self._principal()), daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Pide parar sin bloquear; los dispositivos se cierran en cuanto vence su lectura en curso."""
+        if self._loop is not None and self._parar is not None:
+            self._loop.call_soon_threadsafe(self._parar.set)
+
+    def medir(self, medidor):
+        """Activa (o con None desactiva) la medición de tiempos durante la grabación."""
+        self.medidor = medidor
+        for escritor in self._escritores:
+            escritor.medidor = medidor
+
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def esperar(self, timeout=None):
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    async def _principal(self):
+        self._loop = asyncio.get_running_loop()
+        self._parar = asyncio.Event()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._leer(i, d, t0) for i, d in enumerate(self.dispositivos)))
+
+    async def _leer(self, indice, disp, t0):
+        loop = self._loop
+        prefijo = f"[{disp.nombre}] " if len(self.dispositivos) > 1 else ""
+        lector = crear_lector(disp.modo)
+        ser = escritor = None
+        try:
+            ser = await loop.run_in_executor(
+                None, lambda: serial.Serial(disp.puerto, BAUDIOS[disp.modo], timeout=TIMEOUT_LECTURA))
+            fragmentado = await loop.run_in_executor(
+                None, lambda: EscritorFragmentado(disp.archivo, self.muestras_por_fragmento, self.reanudar))
+            if fragmentado.desfase_ms:
+                self.al_mensaje(f"{prefijo}Continuando grabación interrumpida de {disp.archivo} "
+                                f"(t = {fragmentado.desfase_ms / 1000:.1f} s)")
+            escritor = EscritorBuffer(fragmentado, intervalo_fsync=self.intervalo_fsync, medidor=self.medidor)
+            self._escritores.append(escritor)
+            reloj = RelojDispositivo()
+            ultimo_ms = 0
+            while not self._parar.is_set():
+                if escritor.error is not None:
+                    break  # Se informa al cerrar
+                datos = await loop.run_in_executor(None, ser.read, max(ser.in_waiting, 1))
+                llegada = time.perf_counter()
+                medidor = self.medidor
+                llegada_ms = (llegada - t0) * 1000.0
+                t_ms, kg, mensajes = lector.procesar(datos)
+                if medidor is not None:
+                    medidor.registrar('decodificar', time.perf_counter() - llegada, len(t_ms))
+                for texto in mensajes:
+                    self.al_mensaje(prefijo + texto)
+                if len(t_ms):
+                    # La última muestra del bloque acaba de llegar: actualiza el reloj del dispositivo
+                    reloj.observar(t_ms[-1], llegada_ms)
+                    t_host = np.round(reloj.convertir(t_ms.astype(float)))
+                    # Muestras anteriores al inicio (esperaban en el buffer del puerto): se descartan
+                    recientes = t_host >= 0
+                    t_host, kg = t_host[recientes], kg[recientes]
+                    if len(t_host):
+                        # Al corregirse el desfase, el tiempo no puede retroceder respecto al bloque anterior
+                        t_host = np.maximum(t_host, ultimo_ms).astype(np.uint32)
+                        ultimo_ms = t_host[-1]
+                        t_entrega = time.perf_counter()
+                        escritor.escribir(t_host, kg)
+                        self.al_recibir(indice, t_host, kg)
+                        if medidor is not None:
+                            medidor.registrar('entregar', time.perf_counter() - t_entrega, len(t_host))
+            est = lector.estadisticas()
+            self.al_mensaje(f"{prefijo}Muestras: {est['ok']}, perdidas: {est['perdidas']}, "
+                            f"corruptas: {est['corruptas']}")
+        except Exception as e:
+            self.al_mensaje(f"{prefijo}Error: {e}")
+        finally:
+            if ser is not None:
+                ser.close()
+            if escritor is not None:
+                # Vacía la cola y reensambla el archivo final fuera del bucle de eventos
+                await loop.run_in_executor(None, escritor.cerrar)
+                if escritor.error is not None:
+                    self.al_mensaje(f"{prefijo}Error al guardar: {escritor.error}")
@@ -0,0 +1,178 @@
+# ===== Almacenamiento de grabaciones =====
+# Además del CSV de texto "Tiempo_ms,Fuerza_kg" se admite un formato binario columnar (.bpm):
+#   cabecera de 64 bytes: magia b'BPMOTOR1', versión (uint32), columnas (uint32), muestras (uint64)
+#   columna Tiempo_ms como uint32[n], seguida de la columna Fuerza_kg como float32[n]
+# todo en little-endian. Al cargar se usa np.memmap, así que abrir una grabación de
+# millones de muestras no lee el archivo completo.
+# Todo se escribe en un temporal junto al destino que se renombra con os.replace al terminar:
+# reescribir en su sitio un .bpm que otro lector tiene mapeado lo mataría con SIGBUS.
+# Conversión desde la línea de comandos:
+#   python app/almacenamiento.py entrada.csv salida.bpm
+#   python app/almacenamiento.py entrada.bpm salida.csv
+import os
+import shutil
+import struct
+import sys
+
+import numpy as np
+
+from protocolo_serial import ENCABEZADO_CSV, formatear_csv
+
+MAGIA = b'BPMOTOR1'
+VERSION = 1
+EXTENSION_BINARIA = '.bpm'
+_CABECERA = struct.Struct('<8sIIQ')
+TAM_CABECERA = 64
+DTYPE_TIEMPO = np.dtype('<u4')
+DTYPE_FUERZA = np.dtype('<f4')
+_FILAS_POR_BLOQUE = 1 << 16
+SUFIJO_TEMPORAL = '.tmp'
+
+
+def es_binario(ruta):
+    return os.path.splitext(ruta)[1].lower() == EXTENSION_BINARIA
+
+
+def _escribir_cabecera(f, n):
+    f.seek(0)
+    f.write(_CABECERA.pack(MAGIA, VERSION, 2, n).ljust(TAM_CABECERA, b'\0'))
+
+
+def cargar_binario(ruta):
+    """Abre un .bpm mapeado en memoria. Devuelve (tiempo_ms, fuerza_kg) de solo lectura."""
+    with open(ruta, 'rb') as f:
+        magia, version, columnas, n = _CABECERA.unpack(f.read(_CABECERA.size))
+    if magia != MAGIA or columnas != 2:
+        raise ValueError(f"{os.path.basename(ruta)} no es un archivo {EXTENSION_BINARIA} válido")
+    if version > VERSION:
+        raise ValueError(f"Versión de formato {version} no soportada")
+    if n == 0:
+        return np.empty(0, DTYPE_TIEMPO), np.empty(0, DTYPE_FUERZA)
+    tiempo = np.memmap(ruta, dtype=DTYPE_TIEMPO, mode='r', offset=TAM_CABECERA, shape=(n,))
+    fuerza = np.memmap(ruta, dtype=DTYPE_FUERZA, mode='r',
+                       offset=TAM_CABECERA + n * DTYPE_TIEMPO.itemsize, shape=(n,))
+    return tiempo, fuerza
+
+
+def guardar_binario(ruta, tiempo_ms, fuerza_kg):
+    with open(ruta + SUFIJO_TEMPORAL, 'wb') as f:
+        _escribir_cabecera(f, len(tiempo_ms))
+        f.write(np.ascontiguousarray(tiempo_ms, dtype=DTYPE_TIEMPO).tobytes())
+        f.write(np.ascontiguousarray(fuerza_kg, dtype=DTYPE_FUERZA).tobytes())
+    os.replace(ruta + SUFIJO_TEMPORAL, ruta)
+
+
+def leer_csv_crudo(ruta):
+    """Lee las columnas originales de un CSV como arrays (tiempo_ms, fuerza_kg)."""
+    import pandas as pd
+    df = pd.read_csv(ruta, usecols=["Tiempo_ms", "Fuerza_kg"],
+                     dtype={"Tiempo_ms": np.float64, "Fuerza_kg": np.float64})
+    return df["Tiempo_ms"].to_numpy(), df["Fuerza_kg"].to_numpy()
+
+
+def leer_crudo(ruta):
+    """Devuelve (tiempo_ms, fuerza_kg) de un .csv o .bpm."""
+    if es_binario(ruta):
+        return cargar_binario(ruta)
+    return leer_csv_crudo(ruta)
+
+
+def csv_a_binario(ruta_csv, ruta_bin):
+    guardar_binario(ruta_bin, *leer_csv_crudo(ruta_csv))
+
+
+def binario_a_csv(ruta_bin, ruta_csv):
+    tiempo, fuerza = cargar_binario(ruta_bin)
+    with open(ruta_csv + SUFIJO_TEMPORAL, 'w') as f:
+        f.write(ENCABEZADO_CSV + "\n")
+        for i in range(0, len(tiempo), _FILAS_POR_BLOQUE):
+            f.write(formatear_csv(tiempo[i:i + _FILAS_POR_BLOQUE], fuerza[i:i + _FILAS_POR_BLOQUE]) + "\n")
+    os.replace(ruta_csv + SUFIJO_TEMPORAL, ruta_csv)
+
+
+# ===== Escritores para la grabación =====
+class EscritorCSV:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._f = open(ruta + SUFIJO_TEMPORAL, 'w')
+        self._f.write(ENCABEZADO_CSV + "\n")
+
+    def escribir(self, tiempo_ms, fuerza_kg):
+        if len(tiempo_ms):
+            self._f.write(formatear_csv(tiempo_ms, fuerza_kg) + "\n")
+
+    def sincronizar(self):
+        """Vacía los buffers y fuerza la escritura a disco."""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def cerrar(self):
+        if self._f.closed:
+            return
+        self._f.close()
+        os.replace(self.ruta + SUFIJO_TEMPORAL, self.ruta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class EscritorBinario:
+    """Graba en formato .bpm. La columna de fuerza se escribe en un archivo temporal
+    y se añade detrás de la de tiempo al cerrar, cuando ya se conoce el total; solo entonces
+    el archivo sustituye al destino."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._ruta_fuerza = ruta + '.fuerza.tmp'
+        self._f = open(ruta + SUFIJO_TEMPORAL, 'wb')
+        self._f_fuerza = open(self._ruta_fuerza, 'wb')
+        self._n = 0
+        _escribir_cabecera(self._f, 0)
+
+    def escribir(self, tiempo_ms, fuerza_kg):
+        self._f.write(np.ascontiguousarray(tiempo_ms, dtype=DTYPE_TIEMPO).tobytes())
+        self._f_fuerza.write(np.ascontiguousarray(fuerza_kg, dtype=DTYPE_FUERZA).tobytes())
+        self._n += len(tiempo_ms)
+
+    def sincronizar(self):
+        for f in (self._f, self._f_fuerza):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def cerrar(self):
+        if self._f.closed:
+            return
+        self._f_fuerza.close()
+        with open(self._ruta_fuerza, 'rb') as f_fuerza:
+            shutil.copyfileobj(f_fuerza, self._f)
+        _escribir_cabecera(self._f, self._n)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.remove(self._ruta_fuerza)
+        os.replace(self.ruta + SUFIJO_TEMPORAL, self.ruta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def crear_escritor(ruta):
+    """Elige el escritor según la extensión del archivo destino."""
+    return EscritorBinario(ruta) if es_binario(ruta) else EscritorCSV(ruta)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python almacenamiento.py entrada.(csv|bpm) salida.(bpm|csv)")
+        sys.exit(1)
+    entrada, salida = sys.argv[1:]
+    if es_binario(entrada):
+        binario_a_csv(entrada, salida)
+    else:
+        csv_a_binario(entrada, salida)
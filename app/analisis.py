@@ -0,0 +1,142 @@
+# ===== Motor de análisis sin interfaz gráfica =====
+# Contiene los cálculos que antes vivían en BancoPruebas.calcular_datos para poder
+# usarlos desde la app, desde la línea de comandos o desde otros procesos.
+# No importa tkinter ni matplotlib: solo numpy/scipy (y pandas para leer CSV).
+# Los datos se pueden leer de CSV o del formato binario .bpm (ver almacenamiento.py).
+import numpy as np
+from scipy.integrate import trapezoid, cumulative_trapezoid
+
+from almacenamiento import leer_crudo
+
+G = 9.81
+UMBRAL_FUERZA_N = 0.5  # Muestras por debajo de este empuje se descartan al cargar
+FRACCION_IGNICION = 0.05  # Ignición: primera muestra por encima del 5 % del empuje máximo
+FRACCION_APAGADO = 0.10   # Apagado: última muestra por encima del 10 %
+
+
+def preparar_datos(tiempo_ms, fuerza_kg, preprocesado=None):
+    """Convierte a segundos y newtons y descarta las muestras sin empuje.
+
+    Con 'preprocesado' (una cadena de procesamiento.Preprocesado) la señal cruda pasa por
+    sus etapas en lugar del simple umbral de UMBRAL_FUERZA_N.
+    Devuelve (df, tiempo_s, fuerza_N); el DataFrame comparte memoria con los arrays.
+    """
+    import pandas as pd
+    fuerza = np.asarray(fuerza_kg, dtype=float) * G
+    tiempo = np.asarray(tiempo_ms, dtype=float) / 1000.0
+    if preprocesado is not None:
+        tiempo, fuerza = preprocesado.procesar(tiempo, fuerza)
+    else:
+        mascara = fuerza > UMBRAL_FUERZA_N
+        tiempo, fuerza = tiempo[mascara], fuerza[mascara]
+    df = pd.DataFrame({"Tiempo_s": tiempo, "Fuerza_N": fuerza}, copy=False)
+    return df, tiempo, fuerza
+
+
+def leer_datos(archivo, preprocesado=None):
+    """Lee un CSV 'Tiempo_ms,Fuerza_kg' o un .bpm y devuelve (df, tiempo_s, fuerza_N) ya filtrados."""
+    return preparar_datos(*leer_crudo(archivo), preprocesado=preprocesado)
+
+
+def tramo_quemado(fuerza, fraccion_ignicion=FRACCION_IGNICION, fraccion_apagado=FRACCION_APAGADO,
+                  umbral_minimo=UMBRAL_FUERZA_N):
+    """Índices (inicio, fin) de la ignición y el apagado, o None si no hay quemado."""
+    if len(fuerza) == 0:
+        return None
+    pico = float(np.max(fuerza))
+    i_ign = np.flatnonzero(fuerza >= max(fraccion_ignicion * pico, umbral_minimo))
+    i_apg = np.flatnonzero(fuerza >= max(fraccion_apagado * pico, umbral_minimo))
+    if len(i_ign) == 0 or len(i_apg) == 0:
+        return None
+    return int(i_ign[0]), int(i_apg[-1])
+
+
+# ===== Modelos de consumo de propelente =====
+# Cada modelo recibe (tiempo, fuerza, masa_total_inicial, masa_propelente) y devuelve
+# la masa instantánea en cada muestra. Todos son vectorizados y de coste lineal.
+def masa_lineal(tiempo, fuerza, masa_total_inicial, masa_propelente):
+    """El propelente se consume de forma lineal en el tiempo durante el quemado."""
+    tiempo_quemado = tiempo[-1] - tiempo[0]
+    if tiempo_quemado <= 0:
+        return np.full(len(tiempo), float(masa_total_inicial))
+    # Tras el quemado la masa se queda en la masa de estructura
+    fraccion = np.clip((tiempo - tiempo[0]) / tiempo_quemado, 0.0, 1.0)
+    return masa_total_inicial - masa_propelente * fraccion
+
+
+def masa_por_impulso(tiempo, fuerza, masa_total_inicial, masa_propelente):
+    """El propelente se consume en proporción al impulso acumulado (Isp constante)."""
+    impulso = cumulative_trapezoid(fuerza, tiempo, initial=0)
+    if impulso[-1] <= 0:
+        return np.full(len(tiempo), float(masa_total_inicial))
+    return masa_total_inicial - masa_propelente * (impulso / impulso[-1])
+
+
+MODELOS_MASA = {
+    'lineal': masa_lineal,
+    'impulso': masa_por_impulso
+}
+
+
+def obtener_modelo_masa(modelo):
+    """Acepta el nombre de un modelo de MODELOS_MASA o una función con la misma firma."""
+    if callable(modelo):
+        return modelo
+    try:
+        return MODELOS_MASA[modelo]
+    except KeyError:
+        raise ValueError(f"Modelo de masa desconocido: {modelo!r}") from None
+
+
+def calcular_resultados(tiempo, fuerza, masa_total_inicial, masa_propelente, modelo_masa='lineal'):
+    """Calcula los parámetros del motor a partir de tiempo (s) y empuje (N).
+
+    'modelo_masa' es el nombre de un modelo de MODELOS_MASA o una función propia.
+    Devuelve (calculos, series) donde 'series' contiene los arrays de
+    aceleración, velocidad y altura muestra a muestra.
+    """
+    tiempo = np.asarray(tiempo, dtype=float)
+    fuerza = np.asarray(fuerza, dtype=float)
+    masa_estructura = masa_total_inicial - masa_propelente
+
+    # --- Cálculo de masa instantánea ---
+    tiempo_quemado = tiempo[-1] - tiempo[0]
+    masa_instantanea = obtener_modelo_masa(modelo_masa)(tiempo, fuerza, masa_total_inicial, masa_propelente)
+
+    # --- Cálculo de aceleración, velocidad y altura ---
+    a = fuerza / masa_instantanea
+    v = cumulative_trapezoid(a, tiempo, initial=0)
+    h = cumulative_trapezoid(v, tiempo, initial=0)
+
+    # --- Altura balística después del quemado ---
+    # Suma la altura ganada durante el quemado y la subida balística
+    v_final = v[-1]
+    h_burn = h[-1]
+    h_ballistic = (v_final ** 2) / (2 * G)
+    apogeo_total = h_burn + h_ballistic
+
+    # --- Impulso total ---
+    impulso_total = trapezoid(fuerza, tiempo)
+
+    # --- Isp (impulso específico) ---
+    # Isp = impulso_total / (masa_propelente * g)
+    Isp = impulso_total / (masa_propelente * G) if masa_propelente > 0 else 0
+
+    # --- Relación empuje/peso inicial ---
+    relacion_empuje_peso = fuerza.max() / (masa_total_inicial * G) if masa_total_inicial > 0 else 0
+
+    calculos = {
+        'empuje_max': fuerza.max(),
+        'impulso_total': impulso_total,
+        'tiempo_quemado': tiempo_quemado,
+        'masa_propelente': masa_propelente,
+        'masa_estructura': masa_estructura,
+        'Isp': Isp,
+        'vel_final': v_final,
+        'apogeo': apogeo_total,
+        'tiempo_apogeo': tiempo[-1] + v_final / G,
+        'aceleracion_max': a.max(),
+        'relacion_empuje_peso': relacion_empuje_peso
+    }
+    series = {'aceleracion': a, 'velocidad': v, 'altura': h}
+    return calculos, series
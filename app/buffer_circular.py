@@ -0,0 +1,78 @@
+# ===== Buffer circular sin bloqueos =====
+# Un productor (hilo de lectura serie) y un consumidor (temporizador de la interfaz).
+# El productor escribe primero los datos y después publica el nuevo contador de
+# muestras; el consumidor solo lee hasta el contador publicado, así que no hace
+# falta ningún lock mientras haya un único productor.
+# Mientras el consumidor copia, el productor puede estar pisando las muestras más
+# antiguas. Como en un seqlock, leer() vuelve a mirar el contador después de copiar y
+# descarta el principio que pudo sobrescribirse: el productor escribe en bloques de como
+# mucho 'margen' muestras, así que nunca toca más allá de escritas + margen.
+import numpy as np
+
+
+class BufferCircular:
+    def __init__(self, capacidad=1 << 16, margen=None):
+        self.capacidad = capacidad
+        self.margen = margen or capacidad // 4
+        self._t = np.zeros(capacidad)
+        self._f = np.zeros(capacidad)
+        self.escritas = 0  # Total de muestras escritas (solo crece)
+
+    def escribir(self, t, f):
+        """Añade un bloque de muestras (solo desde el hilo productor)."""
+        n = len(t)
+        if n == 0:
+            return
+        if n > self.capacidad:
+            t, f = t[-self.capacidad:], f[-self.capacidad:]
+            base = self.escritas + n - self.capacidad
+            n = self.capacidad
+        else:
+            base = self.escritas
+        for i in range(0, n, self.margen):
+            self._escribir_bloque(base + i, t[i:i + self.margen], f[i:i + self.margen])
+
+    def _escribir_bloque(self, base, t, f):
+        n = len(t)
+        inicio = base % self.capacidad
+        primera = min(n, self.capacidad - inicio)
+        self._t[inicio:inicio + primera] = t[:primera]
+        self._f[inicio:inicio + primera] = f[:primera]
+        self._t[:n - primera] = t[primera:]
+        self._f[:n - primera] = f[primera:]
+        self.escritas = base + n  # Publicar al final
+
+    def leer(self, desde, hasta=None):
+        """Copia las muestras [desde, hasta) en orden. Devuelve (t, f, hasta).
+
+        Si el productor ya sobrescribió parte del rango, se devuelven solo las
+        muestras que siguen disponibles.
+        """
+        if hasta is None:
+            hasta = self.escritas
+        desde = max(desde, hasta - self.capacidad, 0)
+        n = hasta - desde
+        if n <= 0:
+            return np.empty(0), np.empty(0), hasta
+        idx = np.arange(desde, hasta) % self.capacidad
+        t, f = self._t[idx], self._f[idx]
+        # Validación tras copiar: lo anterior a 'valido' pudo cambiar durante la copia
+        valido = self.escritas + self.margen - self.capacidad
+        if valido > desde:
+            corte = min(valido - desde, n)
+            t, f = t[corte:], f[corte:]
+        return t, f, hasta
+
+    @property
+    def maximo_lectura(self):
+        """Muestras que ultimos() puede devolver sin quedar al alcance del productor."""
+        return self.capacidad - 2 * self.margen
+
+    def ultimos(self, n):
+        """Las últimas 'n' muestras (como mucho maximo_lectura), en orden."""
+        hasta = self.escritas
+        t, f, _ = self.leer(hasta - min(n, self.maximo_lectura), hasta)
+        return t, f
+
+    def reiniciar(self):
+        self.escritas = 0
@@ -0,0 +1,124 @@
+# ===== Base de datos de la campaña de pruebas =====
+# Índice SQLite de todas las grabaciones analizadas: métricas, masas, fecha, ruta a los
+# datos crudos y una traza de empuje reducida (alineada en la ignición) para poder
+# superponer decenas de curvas sin volver a leer los archivos originales.
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+
+from decimacion import decimar_min_max
+
+RUTA_POR_DEFECTO = "campana.sqlite"
+PUNTOS_TRAZA = 1000             # Columnas de la decimación min/max de la traza guardada
+FRACCION_IGNICION = 0.05        # Ignición: primera muestra por encima del 5 % del empuje máximo
+
+METRICAS = ('empuje_max', 'impulso_total', 'tiempo_quemado', 'Isp', 'vel_final', 'apogeo',
+            'aceleracion_max', 'relacion_empuje_peso', 'apogeo_simulado')
+COLUMNAS = ('id', 'ruta', 'fecha', 'masa_total', 'masa_propelente', 'modelo_masa', 'muestras') + METRICAS
+OPERADORES = ('<', '<=', '=', '>=', '>', '!=')
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY,
+    ruta TEXT UNIQUE NOT NULL,
+    fecha TEXT,
+    masa_total REAL,
+    masa_propelente REAL,
+    modelo_masa TEXT,
+    muestras INTEGER,
+    {', '.join(f'{m} REAL' for m in METRICAS)},
+    traza_t BLOB,
+    traza_f BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_corridas_fecha ON corridas (fecha);
+CREATE INDEX IF NOT EXISTS idx_corridas_impulso ON corridas (impulso_total);
+CREATE INDEX IF NOT EXISTS idx_corridas_empuje ON corridas (empuje_max);
+CREATE INDEX IF NOT EXISTS idx_corridas_isp ON corridas (Isp);
+CREATE INDEX IF NOT EXISTS idx_corridas_apogeo ON corridas (apogeo);
+"""
+
+
+def traza_reducida(tiempo, fuerza, puntos=PUNTOS_TRAZA):
+    """Curva de empuje decimada y con t=0 en la ignición, como float32."""
+    tiempo = np.asarray(tiempo, dtype=float)
+    fuerza = np.asarray(fuerza, dtype=float)
+    if len(fuerza) == 0:
+        return np.empty(0, np.float32), np.empty(0, np.float32)
+    i_ign = int(np.argmax(fuerza >= FRACCION_IGNICION * fuerza.max()))
+    t, f = decimar_min_max(tiempo - tiempo[i_ign], fuerza, puntos)
+    return t.astype(np.float32), f.astype(np.float32)
+
+
+class Campana:
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        self.con = sqlite3.connect(ruta)
+        self.con.executescript(_ESQUEMA)
+
+    def cerrar(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def registrar(self, ruta, calculos, masa_total, masa_propelente, modelo_masa='lineal',
+                  traza=None, muestras=None, fecha=None):
+        """Añade o actualiza (por ruta) una corrida. 'traza' es (t, f) de traza_reducida."""
+        ruta = os.path.abspath(ruta)
+        if fecha is None:
+            fecha = datetime.datetime.fromtimestamp(os.path.getmtime(ruta)).isoformat(timespec='seconds')
+        traza_t, traza_f = traza if traza is not None else (np.empty(0, np.float32),) * 2
+        valores = {
+            'ruta': ruta,
+            'fecha': fecha,
+            'masa_total': float(masa_total),
+            'masa_propelente': float(masa_propelente),
+            'modelo_masa': modelo_masa,
+            'muestras': muestras,
+            **{m: float(calculos[m]) if m in calculos else None for m in METRICAS},
+            'traza_t': np.asarray(traza_t, np.float32).tobytes(),
+            'traza_f': np.asarray(traza_f, np.float32).tobytes()
+        }
+        columnas = ', '.join(valores)
+        marcas = ', '.join(f':{c}' for c in valores)
+        actualizar = ', '.join(f'{c} = excluded.{c}' for c in valores if c != 'ruta')
+        with self.con:
+            self.con.execute(f"INSERT INTO corridas ({columnas}) VALUES ({marcas}) "
+                             f"ON CONFLICT(ruta) DO UPDATE SET {actualizar}", valores)
+            return self.con.execute("SELECT id FROM corridas WHERE ruta = ?", (ruta,)).fetchone()[0]
+
+    def buscar(self, *condiciones, orden='fecha', limite=None):
+        """Devuelve las corridas que cumplen todas las condiciones, como diccionarios.
+
+        Cada condición es (columna, operador, valor), por ejemplo ('impulso_total', '>', 80).
+        """
+        where, params = [], []
+        for columna, operador, valor in condiciones:
+            if columna not in COLUMNAS or operador not in OPERADORES:
+                raise ValueError(f"Condición no válida: {columna} {operador} {valor}")
+            where.append(f"{columna} {operador} ?")
+            params.append(valor)
+        if orden.lstrip('-') not in COLUMNAS:
+            raise ValueError(f"Columna de orden no válida: {orden}")
+        sql = f"SELECT {', '.join(COLUMNAS)} FROM corridas"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {orden.lstrip('-')} {'DESC' if orden.startswith('-') else 'ASC'}"
+        if limite is not None:
+            sql += " LIMIT ?"
+            params.append(int(limite))
+        return [dict(zip(COLUMNAS, fila)) for fila in self.con.execute(sql, params)]
+
+    def trazas(self, ids):
+        """Devuelve {id: (t, f)} con las trazas reducidas guardadas."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        marcas = ', '.join('?' * len(ids))
+        filas = self.con.execute(f"SELECT id, traza_t, traza_f FROM corridas WHERE id IN ({marcas})", ids)
+        return {i: (np.frombuffer(t, np.float32), np.frombuffer(f, np.float32)) for i, t, f in filas}
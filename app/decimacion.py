@@ -0,0 +1,33 @@
+# ===== Reducción de puntos para dibujar =====
+# Dibujar más puntos que píxeles no aporta nada: se conserva el mínimo y el máximo
+# de cada columna de píxeles para que los picos sigan siendo visibles.
+import numpy as np
+
+
+def decimar_min_max(t, y, n_columnas):
+    """Devuelve (t, y) con unos 2*n_columnas puntos conservando mínimos, máximos y extremos."""
+    n = len(y)
+    n_columnas = max(int(n_columnas), 1)
+    if n <= 2 * n_columnas:
+        return t, y
+    por_columna = n // n_columnas
+    usado = por_columna * n_columnas
+    bloques = y[:usado].reshape(n_columnas, por_columna)
+    base = np.arange(n_columnas) * por_columna
+    partes = [[0], base + bloques.argmin(axis=1), base + bloques.argmax(axis=1), [n - 1]]
+    if usado < n:
+        # Muestras sobrantes al final: se añaden su mínimo y su máximo
+        resto = y[usado:]
+        partes.append(usado + np.array([resto.argmin(), resto.argmax()]))
+    indices = np.unique(np.concatenate(partes))
+    return t[indices], y[indices]
+
+
+def decimar_ventana(t, y, x0, x1, n_columnas):
+    """Decima solo la parte visible [x0, x1] de los datos a resolución completa.
+
+    Se incluye una muestra a cada lado para que la línea llegue a los bordes.
+    """
+    i0 = max(int(np.searchsorted(t, x0)) - 1, 0)
+    i1 = min(int(np.searchsorted(t, x1, side='right')) + 1, len(t))
+    return decimar_min_max(t[i0:i1], y[i0:i1], n_columnas)
@@ -0,0 +1,228 @@
+# ===== Grabación en fragmentos a prueba de cortes =====
+# Durante la grabación las muestras no van directamente al archivo final, sino a una
+# carpeta '<archivo>.partes' con fragmentos de tamaño fijo:
+#   parte_00000.frag, parte_00001.frag, ...  registros (Tiempo_ms uint32, Fuerza_kg float32)
+#   manifiesto.json                          fragmentos cerrados, inicio y estado de la grabación
+# Un fragmento solo se añade al manifiesto cuando está lleno y sincronizado con disco, y
+# el manifiesto se reemplaza de forma atómica. Si el programa o el equipo se caen, el
+# fragmento abierto se recupera hasta su último registro completo.
+# Al cerrar, los fragmentos se reensamblan en el archivo final (.csv o .bpm) y la carpeta
+# se borra. Una grabación interrumpida se puede reensamblar o continuar:
+#   python app/fragmentos.py empuje.csv.partes            -> escribe empuje.csv
+#   python app/fragmentos.py empuje.csv.partes otro.bpm
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from almacenamiento import crear_escritor
+
+SUFIJO_CARPETA = '.partes'
+MANIFIESTO = 'manifiesto.json'
+VERSION = 1
+MUESTRAS_POR_FRAGMENTO = 1 << 16   # 512 KiB por fragmento
+DTYPE_REGISTRO = np.dtype([('t', '<u4'), ('f', '<f4')])
+
+
+def carpeta_fragmentos(ruta):
+    return ruta + SUFIJO_CARPETA
+
+
+def _nombre_fragmento(indice):
+    return f"parte_{indice:05d}.frag"
+
+
+def _escribir_json_atomico(ruta, datos):
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(datos, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, ruta)
+
+
+def leer_manifiesto(carpeta):
+    with open(os.path.join(carpeta, MANIFIESTO)) as f:
+        return json.load(f)
+
+
+def grabacion_interrumpida(ruta):
+    """True si hay fragmentos de una grabación de 'ruta' que no llegó a cerrarse."""
+    carpeta = carpeta_fragmentos(ruta)
+    try:
+        return leer_manifiesto(carpeta)['estado'] != 'completa'
+    except (OSError, ValueError, KeyError):
+        return bool(glob.glob(os.path.join(carpeta, '*.frag')))
+
+
+def _registros_validos(ruta):
+    # Un corte puede dejar el último registro a medias: se ignoran los bytes sobrantes
+    return os.path.getsize(ruta) // DTYPE_REGISTRO.itemsize
+
+
+def fragmentos_en_disco(carpeta):
+    """Lista ordenada de (ruta, muestras) con todos los fragmentos recuperables."""
+    rutas = sorted(glob.glob(os.path.join(carpeta, 'parte_*.frag')))
+    return [(r, _registros_validos(r)) for r in rutas]
+
+
+def leer_fragmento(ruta, muestras=None):
+    registros = np.fromfile(ruta, dtype=DTYPE_REGISTRO,
+                            count=_registros_validos(ruta) if muestras is None else muestras)
+    return registros['t'], registros['f']
+
+
+def reensamblar(carpeta, destino=None, borrar=True):
+    """Une los fragmentos de 'carpeta' en 'destino' (por defecto, el archivo original).
+
+    Copia fragmento a fragmento, así que la memoria usada no depende de la duración.
+    Devuelve la ruta escrita.
+    """
+    try:
+        manifiesto = leer_manifiesto(carpeta)
+    except (OSError, ValueError):
+        manifiesto = {}
+    if destino is None:
+        destino = manifiesto.get('destino') or carpeta[:-len(SUFIJO_CARPETA)]
+    with crear_escritor(destino) as escritor:
+        for ruta, muestras in fragmentos_en_disco(carpeta):
+            escritor.escribir(*leer_fragmento(ruta, muestras))
+        escritor.sincronizar()
+    if manifiesto:
+        manifiesto['estado'] = 'completa'
+        _escribir_json_atomico(os.path.join(carpeta, MANIFIESTO), manifiesto)
+    if borrar:
+        shutil.rmtree(carpeta)
+    return destino
+
+
+class EscritorFragmentado:
+    """Escritor de grabación con fragmentos rotativos; misma interfaz que EscritorCSV.
+
+    Con 'reanudar' y una grabación interrumpida en la misma ruta, continúa tras el último
+    fragmento: los tiempos nuevos se desplazan con el tiempo real transcurrido desde el
+    inicio de la grabación original, así que el hueco del corte queda reflejado.
+    """
+
+    def __init__(self, ruta, muestras_por_fragmento=MUESTRAS_POR_FRAGMENTO, reanudar=False):
+        self.ruta = ruta
+        self.carpeta = carpeta_fragmentos(ruta)
+        self.muestras_por_fragmento = muestras_por_fragmento
+        self.desfase_ms = 0
+        self._f = None
+        self._en_fragmento = 0
+        self._t_fin = -1
+
+        if reanudar and grabacion_interrumpida(ruta):
+            self._recuperar()
+        else:
+            if os.path.isdir(self.carpeta):
+                shutil.rmtree(self.carpeta)
+            os.makedirs(self.carpeta)
+            self.manifiesto = {
+                'version': VERSION,
+                'destino': os.path.abspath(ruta),
+                'inicio': time.time(),
+                'sesiones': 1,
+                'estado': 'grabando',
+                'muestras_por_fragmento': muestras_por_fragmento,
+                'fragmentos': []
+            }
+            self._guardar_manifiesto()
+        self._abrir_fragmento()
+
+    def _recuperar(self):
+        try:
+            self.manifiesto = leer_manifiesto(self.carpeta)
+        except (OSError, ValueError):
+            self.manifiesto = {'version': VERSION, 'destino': os.path.abspath(self.ruta),
+                               'inicio': time.time(), 'sesiones': 0,
+                               'muestras_por_fragmento': self.muestras_por_fragmento}
+        # Los fragmentos que no llegaron al manifiesto se recortan al último registro completo
+        cerrados = {fr['archivo']: fr for fr in self.manifiesto.get('fragmentos', [])}
+        fragmentos = []
+        for ruta, muestras in fragmentos_en_disco(self.carpeta):
+            fr = cerrados.get(os.path.basename(ruta))
+            if fr is not None and fr['muestras'] == muestras:
+                fragmentos.append(fr)
+                continue
+            if muestras == 0:
+                os.remove(ruta)
+                continue
+            with open(ruta, 'r+b') as f:
+                f.truncate(muestras * DTYPE_REGISTRO.itemsize)
+            t, _ = leer_fragmento(ruta, muestras)
+            fragmentos.append({'archivo': os.path.basename(ruta), 'muestras': int(muestras),
+                               't_inicio': int(t[0]), 't_fin': int(t[-1])})
+        self.manifiesto.update(estado='grabando', fragmentos=fragmentos,
+                               sesiones=self.manifiesto.get('sesiones', 0) + 1)
+        if fragmentos:
+            self._t_fin = fragmentos[-1]['t_fin']
+        transcurrido_ms = int((time.time() - self.manifiesto['inicio']) * 1000)
+        self.desfase_ms = max(transcurrido_ms, self._t_fin + 1)
+        self._guardar_manifiesto()
+
+    def _guardar_manifiesto(self):
+        _escribir_json_atomico(os.path.join(self.carpeta, MANIFIESTO), self.manifiesto)
+
+    def _abrir_fragmento(self):
+        indice = len(self.manifiesto['fragmentos'])
+        self._f = open(os.path.join(self.carpeta, _nombre_fragmento(indice)), 'wb')
+        self._en_fragmento = 0
+        self._t_inicio = None
+
+    def _cerrar_fragmento(self):
+        self.sincronizar()
+        self._f.close()
+        if self._en_fragmento:
+            self.manifiesto['fragmentos'].append({
+                'archivo': os.path.basename(self._f.name), 'muestras': self._en_fragmento,
+                't_inicio': self._t_inicio, 't_fin': self._t_fin})
+            self._guardar_manifiesto()
+        else:
+            os.remove(self._f.name)
+
+    def escribir(self, tiempo_ms, fuerza_kg):
+        registros = np.empty(len(tiempo_ms), DTYPE_REGISTRO)
+        registros['t'] = np.asarray(tiempo_ms, dtype=np.int64) + self.desfase_ms
+        registros['f'] = fuerza_kg
+        while len(registros):
+            hueco = self.muestras_por_fragmento - self._en_fragmento
+            parte, registros = registros[:hueco], registros[hueco:]
+            self._f.write(parte.tobytes())
+            if self._t_inicio is None:
+                self._t_inicio = int(parte['t'][0])
+            self._t_fin = int(parte['t'][-1])
+            self._en_fragmento += len(parte)
+            if self._en_fragmento >= self.muestras_por_fragmento:
+                self._cerrar_fragmento()
+                self._abrir_fragmento()
+
+    def sincronizar(self):
+        """Vacía el fragmento abierto y lo fuerza a disco."""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def cerrar(self, reensamblar_final=True):
+        if self._f.closed:
+            return
+        self._cerrar_fragmento()
+        if reensamblar_final:
+            reensamblar(self.carpeta, self.ruta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python fragmentos.py carpeta.partes [salida.(csv|bpm)]")
+        sys.exit(1)
+    print(f"Escrito {reensamblar(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)}")
@@ -0,0 +1,69 @@
+# ===== Gráfica de empuje en tiempo real =====
+# Se redibuja con blitting: el fondo (ejes, rejilla, etiquetas) se guarda una vez y en
+# cada cuadro solo se pinta la línea. El redibujado completo solo ocurre cuando cambian
+# los límites de los ejes o el tamaño de la ventana.
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from decimacion import decimar_min_max
+
+
+class GraficaEnVivo:
+    def __init__(self, master, ventana_s=10.0, color='blue', dpi=100):
+        self.ventana_s = ventana_s
+        self.fig = Figure(figsize=(6, 2.6), dpi=dpi)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel("Tiempo (s)", fontsize=9)
+        self.ax.set_ylabel("Empuje (N)", fontsize=9)
+        self.ax.tick_params(axis='both', labelsize=8)
+        self.ax.grid(True)
+        self.ax.set_xlim(0, ventana_s)
+        self.ax.set_ylim(-1, 10)
+        self.linea, = self.ax.plot([], [], lw=1.5, color=color, animated=True)
+        self.fig.tight_layout(pad=0.8)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._fondo = None
+        self.canvas.mpl_connect('draw_event', self._guardar_fondo)
+        self.canvas.draw()
+
+    def _guardar_fondo(self, event=None):
+        self._fondo = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.linea)
+
+    def actualizar(self, t, f):
+        """Dibuja los datos de la ventana visible. t y f deben estar ordenados por tiempo."""
+        if len(t) == 0:
+            return
+        if self._ajustar_limites(t, f) or self._fondo is None:
+            self.canvas.draw()  # Dispara draw_event y guarda el nuevo fondo
+        x0, x1 = self.ax.get_xlim()
+        i0 = t.searchsorted(x0)
+        ancho = max(int(self.ax.bbox.width), 1)
+        self.linea.set_data(*decimar_min_max(t[i0:], f[i0:], ancho))
+        self.canvas.restore_region(self._fondo)
+        self.ax.draw_artist(self.linea)
+        self.canvas.blit(self.ax.bbox)
+
+    def _ajustar_limites(self, t, f):
+        cambiado = False
+        x0, x1 = self.ax.get_xlim()
+        if t[-1] > x1 or t[-1] < x0:
+            # Avanza media ventana de golpe para no redibujar los ejes en cada cuadro
+            x1 = max(t[-1] + self.ventana_s / 2, self.ventana_s)
+            self.ax.set_xlim(x1 - self.ventana_s, x1)
+            cambiado = True
+        y0, y1 = self.ax.get_ylim()
+        f_min, f_max = f.min(), f.max()
+        if f_max > y1 or f_min < y0:
+            margen = 0.1 * max(f_max - f_min, 1.0)
+            self.ax.set_ylim(min(y0, f_min - margen), max(y1, f_max + margen))
+            cambiado = True
+        return cambiado
+
+    def reiniciar(self):
+        self.ax.set_xlim(0, self.ventana_s)
+        self.ax.set_ylim(-1, 10)
+        self.linea.set_data([], [])
+        self.canvas.draw()
@@ -0,0 +1,47 @@
+# ===== Medición de tiempos por etapa =====
+# Cada etapa de la grabación (decodificar, entregar a la interfaz, escribir a disco,
+# dibujar) registra cuánto tardó y cuántas muestras movió. resumen() devuelve las
+# estadísticas del intervalo desde la llamada anterior y las reinicia, así que la memoria
+# no crece con la duración de la grabación.
+# Las etapas se registran desde varios hilos; un lock protege el diccionario.
+import threading
+import time
+
+
+class MedidorEtapas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}
+        self._desde = time.perf_counter()
+
+    def registrar(self, etapa, segundos, muestras=0):
+        with self._lock:
+            d = self._datos.get(etapa)
+            if d is None:
+                self._datos[etapa] = [1, segundos, segundos, muestras]
+            else:
+                d[0] += 1
+                d[1] += segundos
+                d[2] = max(d[2], segundos)
+                d[3] += muestras
+
+    def resumen(self):
+        """{etapa: {'llamadas', 'media_ms', 'max_ms', 'muestras_s'}} del último intervalo."""
+        ahora = time.perf_counter()
+        with self._lock:
+            datos, self._datos = self._datos, {}
+            intervalo, self._desde = ahora - self._desde, ahora
+        intervalo = max(intervalo, 1e-9)
+        return {etapa: {'llamadas': n,
+                        'media_ms': 1000.0 * total / n,
+                        'max_ms': 1000.0 * maximo,
+                        'muestras_s': muestras / intervalo}
+                for etapa, (n, total, maximo, muestras) in datos.items()}
+
+    @staticmethod
+    def texto(resumen):
+        if not resumen:
+            return "Sin actividad"
+        return "\n".join(f"{etapa:<12} {r['media_ms']:7.3f} ms (máx {r['max_ms']:7.3f}) "
+                         f"{r['llamadas']:5d} llamadas  {r['muestras_s']:10,.0f} muestras/s"
+                         for etapa, r in resumen.items())
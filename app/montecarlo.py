@@ -0,0 +1,104 @@
+# ===== Análisis de incertidumbre por Monte Carlo =====
+# Repite el cálculo de analisis.calcular_resultados miles de veces perturbando el factor
+# de calibración de la celda, las masas introducidas, el instante de cada muestra y el
+# ruido de la fuerza. Cada lote de corridas se calcula con operaciones numpy 2-D
+# (una fila por corrida) y los lotes se reparten entre procesos.
+# La semilla de cada lote se deriva de la semilla global con SeedSequence.spawn, así que
+# el resultado es el mismo sea cual sea el número de procesos.
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.integrate import trapezoid, cumulative_trapezoid
+
+from analisis import G
+
+# Desviaciones típicas por defecto
+INCERTIDUMBRES = {
+    'factor_calibracion': 0.005,   # relativa (0.5 % del factor de la celda de carga)
+    'masa_total': 0.010,           # kg
+    'masa_propelente': 0.005,      # kg
+    'jitter_tiempo': 0.0005,       # s por muestra
+    'ruido_fuerza': 0.05           # N por muestra
+}
+METRICAS = ('apogeo', 'Isp', 'impulso_total', 'aceleracion_max')
+PERCENTILES = (2.5, 50.0, 97.5)
+_ELEMENTOS_POR_LOTE = 2_000_000  # Limita la memoria de cada lote (corridas × muestras)
+
+
+def _fraccion_lote(t, f, modelo_masa):
+    # Fracción de propelente consumida por fila, igual que analisis.MODELOS_MASA
+    if modelo_masa == 'lineal':
+        duracion = t[:, -1:] - t[:, :1]
+        return np.clip((t - t[:, :1]) / np.where(duracion > 0, duracion, 1.0), 0.0, 1.0)
+    if modelo_masa == 'impulso':
+        impulso = cumulative_trapezoid(f, t, axis=1, initial=0)
+        total = impulso[:, -1:]
+        return np.where(total > 0, impulso / np.where(total > 0, total, 1.0), 0.0)
+    raise ValueError(f"Modelo de masa no soportado en Monte Carlo: {modelo_masa!r}")
+
+
+def analizar_lote(tiempo, fuerza, masa_total, masa_prop, n, semilla, modelo_masa='lineal',
+                  incertidumbres=None):
+    """Calcula 'n' corridas perturbadas a la vez. Devuelve un diccionario de arrays (n,)."""
+    inc = {**INCERTIDUMBRES, **(incertidumbres or {})}
+    rng = np.random.default_rng(semilla)
+    n_muestras = len(tiempo)
+
+    # El empuje medido es inversamente proporcional al factor de calibración
+    escala = 1.0 / (1.0 + rng.normal(0.0, inc['factor_calibracion'], (n, 1)))
+    f = fuerza * escala + rng.normal(0.0, inc['ruido_fuerza'], (n, n_muestras))
+    t = np.sort(tiempo + rng.normal(0.0, inc['jitter_tiempo'], (n, n_muestras)), axis=1)
+    m0 = masa_total + rng.normal(0.0, inc['masa_total'], n)
+    mp = np.clip(masa_prop + rng.normal(0.0, inc['masa_propelente'], n), 1e-9, None)
+    mp = np.minimum(mp, 0.999 * m0)
+
+    masa = m0[:, None] - mp[:, None] * _fraccion_lote(t, f, modelo_masa)
+    a = f / masa
+    v = cumulative_trapezoid(a, t, axis=1, initial=0)
+    h = cumulative_trapezoid(v, t, axis=1, initial=0)
+    impulso = trapezoid(f, t, axis=1)
+    return {
+        'apogeo': h[:, -1] + v[:, -1] ** 2 / (2 * G),
+        'Isp': impulso / (mp * G),
+        'impulso_total': impulso,
+        'aceleracion_max': a.max(axis=1)
+    }
+
+
+def resumir(muestras, percentiles=PERCENTILES):
+    """Media, desviación típica y percentiles de cada métrica."""
+    resumen = {}
+    for nombre, valores in muestras.items():
+        p = np.percentile(valores, percentiles)
+        resumen[nombre] = {
+            'media': float(np.mean(valores)),
+            'desv': float(np.std(valores, ddof=1)) if len(valores) > 1 else 0.0,
+            'percentiles': dict(zip(percentiles, map(float, p)))
+        }
+    return resumen
+
+
+def ejecutar_montecarlo(tiempo, fuerza, masa_total, masa_prop, n=20000, semilla=0,
+                        procesos=None, modelo_masa='lineal', incertidumbres=None):
+    """Ejecuta 'n' corridas repartidas en lotes. Devuelve (muestras, resumen).
+
+    'procesos=1' calcula en el propio proceso; None usa todos los núcleos.
+    """
+    tiempo = np.asarray(tiempo, dtype=float)
+    fuerza = np.asarray(fuerza, dtype=float)
+    tam_lote = max(1, min(n, _ELEMENTOS_POR_LOTE // max(len(tiempo), 1)))
+    n_lotes = math.ceil(n / tam_lote)
+    tamanos = [min(tam_lote, n - i * tam_lote) for i in range(n_lotes)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_lotes)
+    argumentos = [(tiempo, fuerza, masa_total, masa_prop, tam, sem, modelo_masa, incertidumbres)
+                  for tam, sem in zip(tamanos, semillas)]
+
+    if procesos == 1 or n_lotes == 1:
+        lotes = [analizar_lote(*arg) for arg in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            lotes = list(pool.map(analizar_lote, *zip(*argumentos)))
+
+    muestras = {m: np.concatenate([lote[m] for lote in lotes]) for m in METRICAS}
+    return muestras, resumir(muestras)
@@ -0,0 +1,249 @@
+# ===== Exportación de archivos de motor e interpolación del empuje =====
+# Convierte la curva medida (tiempo en s, empuje en N) en archivos de motor para
+# simuladores de vuelo:
+#   .eng -> formato RASP (OpenRocket, RockSim, wRASP...), limitado a pocos puntos
+#   .rse -> formato XML de RockSim, con la masa de propelente restante en cada punto
+# La curva se reduce a 'max_puntos' eligiendo en cada paso la muestra que más se aparta
+# de la poligonal ya elegida (Douglas-Peucker por error vertical), así que se conservan
+# el pico, la rampa de subida y la cola de apagado.
+# EmpujeInterpolado da una función vectorizada del empuje (PCHIP, Akima, spline de
+# suavizado o lineal) con su impulso acumulado; interpolador_empuje la guarda en caché
+# por curva para que la simulación o las comparaciones no la vuelvan a ajustar.
+# Uso:
+#   python app/motor.py grabacion.csv motor.eng --nombre BP29 --diametro 29 --largo 124 \
+#       --propelente 0.04 --masa-motor 0.09
+import argparse
+import hashlib
+import heapq
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+import numpy as np
+from scipy.integrate import cumulative_trapezoid, trapezoid
+from scipy.interpolate import (Akima1DInterpolator, PchipInterpolator, make_interp_spline,
+                               make_smoothing_spline)
+
+from analisis import tramo_quemado
+
+PUNTOS_ENG = 32          # Límite habitual de los lectores RASP
+PUNTOS_RSE = 100
+_TAM_CACHE = 8
+
+
+# ===== Reducción de puntos =====
+def reducir_puntos(tiempo, fuerza, max_puntos):
+    """Índices (ordenados) de como mucho 'max_puntos' muestras que conservan la forma.
+
+    Siempre incluye la primera, la última y la de empuje máximo.
+    """
+    t = np.asarray(tiempo, dtype=float)
+    f = np.asarray(fuerza, dtype=float)
+    n = len(t)
+    if n <= max_puntos:
+        return np.arange(n)
+    elegidos = sorted({0, n - 1, int(np.argmax(f))})
+    pendientes = []
+
+    def encolar(i, j):
+        if j - i < 2:
+            return
+        tramo = slice(i + 1, j)
+        recta = f[i] + (f[j] - f[i]) * (t[tramo] - t[i]) / (t[j] - t[i])
+        error = np.abs(f[tramo] - recta)
+        k = int(np.argmax(error))
+        heapq.heappush(pendientes, (-error[k], i, j, i + 1 + k))
+
+    for i, j in zip(elegidos[:-1], elegidos[1:]):
+        encolar(i, j)
+    while len(elegidos) < max_puntos and pendientes:
+        _, i, j, k = heapq.heappop(pendientes)
+        elegidos.append(k)
+        encolar(i, k)
+        encolar(k, j)
+    return np.sort(np.array(elegidos[:max_puntos]))
+
+
+def curva_motor(tiempo, fuerza, max_puntos):
+    """Curva reducida con t=0 en la ignición y cerrada con empuje cero al apagado.
+
+    Antes de reducir se recorta al quemado con la regla de DetectorQuemado (del 5 % del
+    pico al último 10 %): el ruido antes de la ignición o tras el apagado desplazaría t=0
+    y gastaría puntos. La ignición se sitúa un intervalo de muestreo antes de la primera
+    muestra del quemado, porque los simuladores suponen empuje nulo en t=0.
+    """
+    t = np.asarray(tiempo, dtype=float)
+    f = np.clip(np.asarray(fuerza, dtype=float), 0.0, None)
+    tramo = tramo_quemado(f)
+    if tramo is not None:
+        t, f = t[tramo[0]:tramo[1] + 1], f[tramo[0]:tramo[1] + 1]
+    dt = float(np.median(np.diff(t))) if len(t) > 1 else 0.001
+    t = t - t[0] + dt
+    cerrar = f[-1] > 0
+    idx = reducir_puntos(t, f, max_puntos - 1 if cerrar else max_puntos)
+    t_red, f_red = t[idx], f[idx]
+    if cerrar:
+        t_red = np.append(t_red, t[-1] + dt)
+        f_red = np.append(f_red, 0.0)
+    return t_red, f_red
+
+
+def _propelente_restante(t, f, masa_propelente):
+    # El propelente se consume en proporción al impulso acumulado
+    impulso = cumulative_trapezoid(f, t, initial=0)
+    total = impulso[-1] if impulso[-1] > 0 else 1.0
+    return masa_propelente * (1.0 - impulso / total)
+
+
+# ===== Archivos de motor =====
+def exportar_eng(ruta, tiempo, fuerza, nombre, diametro_mm, largo_mm, masa_propelente, masa_total,
+                 retardos='P', fabricante='BancoPruebas', max_puntos=PUNTOS_ENG, comentario=None):
+    """Escribe un archivo RASP .eng. Masas en kg; devuelve la curva exportada (t, f)."""
+    t, f = curva_motor(tiempo, fuerza, max_puntos)
+    lineas = [f"; {comentario or 'Generado por el banco de pruebas'}",
+              f"; Impulso total {trapezoid(f, t):.2f} N·s, empuje máximo {f.max():.2f} N",
+              f"{nombre.replace(' ', '_')} {diametro_mm:g} {largo_mm:g} {retardos} "
+              f"{masa_propelente:.4f} {masa_total:.4f} {fabricante.replace(' ', '_')}"]
+    lineas += [f"   {ti:.4f} {fi:.3f}" for ti, fi in zip(t, f)]
+    lineas.append(";")
+    with open(ruta, 'w', encoding='utf-8') as arch:
+        arch.write("\n".join(lineas) + "\n")
+    return t, f
+
+
+def exportar_rse(ruta, tiempo, fuerza, nombre, diametro_mm, largo_mm, masa_propelente, masa_total,
+                 retardos='0', fabricante='BancoPruebas', max_puntos=PUNTOS_RSE, comentario=None):
+    """Escribe un archivo RockSim .rse (XML). Masas en kg; devuelve la curva exportada (t, f)."""
+    t, f = curva_motor(tiempo, fuerza, max_puntos)
+    impulso = trapezoid(f, t)
+    masa_g = _propelente_restante(t, f, masa_propelente) * 1000.0
+    motor = ET.Element('engine', {
+        'mfg': fabricante, 'code': nombre, 'Type': 'reload', 'dia': f"{diametro_mm:g}",
+        'len': f"{largo_mm:g}", 'initWt': f"{masa_total * 1000:.2f}", 'propWt': f"{masa_propelente * 1000:.2f}",
+        'delays': retardos, 'auto-calc-mass': '0', 'auto-calc-cg': '0',
+        'avgThrust': f"{impulso / t[-1]:.3f}", 'peakThrust': f"{f.max():.3f}", 'Itot': f"{impulso:.3f}",
+        'burn-time': f"{t[-1]:.4f}", 'massFrac': f"{100 * masa_propelente / masa_total:.2f}" if masa_total > 0 else '0',
+        'Isp': f"{impulso / (masa_propelente * 9.81):.2f}" if masa_propelente > 0 else '0',
+        'throatDia': '0.', 'exitDia': '0.'})
+    ET.SubElement(motor, 'comments').text = comentario or 'Generado por el banco de pruebas'
+    datos = ET.SubElement(motor, 'data')
+    for ti, fi, mi in zip(t, f, masa_g):
+        ET.SubElement(datos, 'eng-data', {'t': f"{ti:.4f}", 'f': f"{fi:.3f}", 'm': f"{mi:.3f}",
+                                          'cg': f"{largo_mm / 2:g}"})
+    base = ET.Element('engine-database')
+    ET.SubElement(base, 'engine-list').append(motor)
+    ET.indent(base)
+    ET.ElementTree(base).write(ruta, encoding='utf-8', xml_declaration=True)
+    return t, f
+
+
+EXPORTADORES = {'.eng': exportar_eng, '.rse': exportar_rse}
+
+
+def exportar_motor(ruta, tiempo, fuerza, **kwargs):
+    """Elige el formato por la extensión de 'ruta' (.eng o .rse)."""
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext not in EXPORTADORES:
+        raise ValueError(f"Formato de motor no soportado: {ext or ruta}")
+    return EXPORTADORES[ext](ruta, tiempo, fuerza, **kwargs)
+
+
+# ===== Interpolación del empuje =====
+class EmpujeInterpolado:
+    """Empuje F(t) ajustado a la curva medida, vectorizado y nulo fuera del quemado.
+
+    'pchip' y 'akima' pasan por las muestras sin sobreoscilar; 'spline' es un spline
+    cúbico de suavizado (el suavizado se elige por validación cruzada generalizada).
+    """
+
+    def __init__(self, tiempo, fuerza, metodo='pchip'):
+        t, unicos = np.unique(np.asarray(tiempo, dtype=float), return_index=True)
+        f = np.asarray(fuerza, dtype=float)[unicos]
+        if len(t) < 2:
+            raise ValueError("Se necesitan al menos dos muestras para interpolar")
+        if metodo == 'pchip':
+            self._curva = PchipInterpolator(t, f)
+        elif metodo == 'akima':
+            self._curva = Akima1DInterpolator(t, f)
+        elif metodo == 'spline':
+            self._curva = make_smoothing_spline(t, f) if len(t) >= 5 else make_interp_spline(t, f, k=1)
+        elif metodo == 'lineal':
+            self._curva = make_interp_spline(t, f, k=1)
+        else:
+            raise ValueError(f"Método de interpolación desconocido: {metodo!r}")
+        self.metodo = metodo
+        self.t0, self.t1 = float(t[0]), float(t[-1])
+        # La interpolación lineal se evalúa con np.interp, bastante más rápido por llamada
+        self._evaluar = (lambda x: np.interp(x, t, f)) if metodo == 'lineal' else self._curva
+        self._primitiva = self._curva.antiderivative()
+        self._primitiva_t0 = float(self._primitiva(self.t0))
+
+    def __call__(self, t):
+        if isinstance(t, float):
+            # Camino rápido para los integradores de paso adaptativo, que piden un instante cada vez
+            return float(self._evaluar(t)) if self.t0 <= t <= self.t1 else 0.0
+        t = np.asarray(t, dtype=float)
+        dentro = (t >= self.t0) & (t <= self.t1)
+        return np.where(dentro, self._evaluar(np.clip(t, self.t0, self.t1)), 0.0)
+
+    def impulso(self, t):
+        """Impulso acumulado desde la ignición hasta 't' (N·s)."""
+        return self._primitiva(np.clip(np.asarray(t, dtype=float), self.t0, self.t1)) - self._primitiva_t0
+
+    @property
+    def impulso_total(self):
+        return float(self.impulso(self.t1))
+
+
+_cache_interpoladores = OrderedDict()
+
+
+def interpolador_empuje(tiempo, fuerza, metodo='pchip'):
+    """EmpujeInterpolado de la curva, reutilizado si ya se ajustó la misma curva."""
+    tiempo = np.ascontiguousarray(tiempo, dtype=float)
+    fuerza = np.ascontiguousarray(fuerza, dtype=float)
+    huella = hashlib.blake2b(digest_size=16)
+    huella.update(tiempo.tobytes())
+    huella.update(fuerza.tobytes())
+    clave = (metodo, huella.digest())
+    if clave in _cache_interpoladores:
+        _cache_interpoladores.move_to_end(clave)
+        return _cache_interpoladores[clave]
+    interpolador = EmpujeInterpolado(tiempo, fuerza, metodo)
+    _cache_interpoladores[clave] = interpolador
+    if len(_cache_interpoladores) > _TAM_CACHE:
+        _cache_interpoladores.popitem(last=False)
+    return interpolador
+
+
+def main(argv=None):
+    from analisis import leer_datos
+    parser = argparse.ArgumentParser(description="Exporta una grabación como archivo de motor .eng o .rse.")
+    parser.add_argument('entrada', help="Grabación (.csv o .bpm)")
+    parser.add_argument('salida', help="Archivo de motor (.eng o .rse)")
+    parser.add_argument('--nombre', default=None, help="Designación del motor (por defecto, el nombre del archivo)")
+    parser.add_argument('--diametro', type=float, default=29.0, help="Diámetro del motor (mm)")
+    parser.add_argument('--largo', type=float, default=124.0, help="Longitud del motor (mm)")
+    parser.add_argument('--propelente', type=float, default=0.4, help="Masa de propelente (kg)")
+    parser.add_argument('--masa-motor', type=float, default=None, help="Masa del motor cargado (kg)")
+    parser.add_argument('--retardos', default='P', help="Retardos disponibles, p. ej. 0-5-7 o P")
+    parser.add_argument('--fabricante', default='BancoPruebas')
+    parser.add_argument('--puntos', type=int, default=None, help="Máximo de puntos de la curva")
+    args = parser.parse_args(argv)
+
+    _, tiempo, fuerza = leer_datos(args.entrada)
+    opciones = dict(nombre=args.nombre or os.path.splitext(os.path.basename(args.entrada))[0],
+                    diametro_mm=args.diametro, largo_mm=args.largo, masa_propelente=args.propelente,
+                    masa_total=args.masa_motor or args.propelente, retardos=args.retardos,
+                    fabricante=args.fabricante)
+    if args.puntos:
+        opciones['max_puntos'] = args.puntos
+    t, f = exportar_motor(args.salida, tiempo, fuerza, **opciones)
+    print(f"{args.salida}: {len(t)} puntos, impulso {trapezoid(f, t):.2f} N·s "
+          f"(medido {trapezoid(fuerza, tiempo):.2f} N·s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
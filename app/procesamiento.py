@@ -0,0 +1,328 @@
+# ===== Preprocesado de la señal de empuje =====
+# Cadena configurable de etapas que se aplica antes de calcular_resultados:
+#   RechazoAtipicos   -> filtro de Hampel (mediana móvil y MAD) contra picos de ruido
+#   CorreccionDeriva  -> resta la línea base medida antes de la ignición (y después del apagado)
+#   Remuestreo        -> pasa el Tiempo_ms irregular del Arduino a una rejilla uniforme
+#   FiltroButterworth -> paso bajo de fase cero (sosfiltfilt)
+#   FiltroSavitzkyGolay
+#   DetectorQuemado   -> ignición/apagado al 5 %/10 % del empuje máximo y recorte
+# Todas las etapas son vectorizadas. Además de procesar(t, f) sobre la grabación completa,
+# aceptan bloques sucesivos con bloque(t, f) y finalizar(), para usarlas en streaming:
+# las etapas con ventana retienen las últimas muestras hasta tener contexto suficiente.
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import butter, sosfiltfilt, savgol_filter
+
+from analisis import FRACCION_APAGADO, FRACCION_IGNICION, UMBRAL_FUERZA_N, tramo_quemado
+
+_VACIO = (np.empty(0), np.empty(0))
+
+
+def _periodo(t):
+    return float(np.median(np.diff(t))) if len(t) > 1 else 1.0
+
+
+class Etapa:
+    """Etapa sin estado: en streaming cada bloque se procesa por separado."""
+
+    def procesar(self, t, f):
+        raise NotImplementedError
+
+    def bloque(self, t, f):
+        return self.procesar(t, f) if len(t) else _VACIO
+
+    def finalizar(self):
+        return _VACIO
+
+    def reiniciar(self):
+        pass
+
+
+class EtapaVentana(Etapa):
+    """Etapa cuyo resultado en cada muestra depende de 'radio' muestras a cada lado.
+
+    En streaming no emite nada hasta reunir una ventana completa (2*radio + 1 muestras),
+    retiene esa ventana entre bloques y emite cada muestra cuando ya tiene su contexto. Para
+    los filtros locales (Hampel, Savitzky-Golay) el resultado coincide con procesar() en
+    bloque, también en los extremos de la grabación.
+    """
+    radio = 0
+
+    def reiniciar(self):
+        self._t = np.empty(0)
+        self._f = np.empty(0)
+        self._pendiente = 0  # Índice (en lo retenido) de la primera muestra sin emitir
+
+    def bloque(self, t, f):
+        if not hasattr(self, '_t'):
+            self.reiniciar()
+        self._t = np.concatenate((self._t, t))
+        self._f = np.concatenate((self._f, f))
+        fin = len(self._t) - self.radio
+        if fin <= self._pendiente or len(self._t) < 2 * self.radio + 1:
+            return _VACIO
+        t_out, f_out = self.procesar(self._t, self._f)
+        emit = slice(self._pendiente, fin)
+        resultado = (t_out[emit], f_out[emit])
+        corte = max(len(self._t) - 2 * self.radio - 1, 0)
+        self._t, self._f = self._t[corte:], self._f[corte:]
+        self._pendiente = fin - corte
+        return resultado
+
+    def finalizar(self):
+        if not hasattr(self, '_t') or self._pendiente >= len(self._t):
+            return _VACIO
+        t_out, f_out = self.procesar(self._t, self._f)
+        resultado = (t_out[self._pendiente:], f_out[self._pendiente:])
+        self.reiniciar()
+        return resultado
+
+
+class RechazoAtipicos(EtapaVentana):
+    """Filtro de Hampel: sustituye por la mediana local las muestras a más de n_sigma MAD."""
+
+    def __init__(self, ventana=7, n_sigma=4.0):
+        self.radio = ventana // 2
+        self.n_sigma = n_sigma
+
+    def procesar(self, t, f):
+        if len(f) < 2 * self.radio + 1:
+            return t, f
+        ancho = 2 * self.radio + 1
+        relleno = np.pad(f, self.radio, mode='edge')
+        ventanas = sliding_window_view(relleno, ancho)
+        mediana = np.median(ventanas, axis=1)
+        mad = 1.4826 * np.median(np.abs(ventanas - mediana[:, None]), axis=1)
+        atipico = np.abs(f - mediana) > self.n_sigma * np.maximum(mad, 1e-9)
+        return t, np.where(atipico, mediana, f)
+
+
+class FiltroSavitzkyGolay(EtapaVentana):
+    def __init__(self, ventana=11, orden=3):
+        self.ventana = ventana | 1
+        self.orden = orden
+        self.radio = self.ventana // 2
+
+    def procesar(self, t, f):
+        if len(f) < self.ventana:
+            return t, f
+        return t, savgol_filter(f, self.ventana, self.orden)
+
+
+class FiltroButterworth(EtapaVentana):
+    """Paso bajo de fase cero. Necesita una rejilla uniforme (usar después de Remuestreo).
+
+    En streaming se filtra con 'radio' muestras de contexto a cada lado; como el filtro
+    es IIR el resultado es una aproximación muy cercana al filtrado en bloque.
+    """
+
+    def __init__(self, frecuencia_corte=20.0, orden=4, muestras_contexto=200):
+        self.frecuencia_corte = frecuencia_corte
+        self.orden = orden
+        self.radio = muestras_contexto
+
+    def procesar(self, t, f):
+        fs = 1.0 / _periodo(t)
+        if len(f) < 3 * (2 * self.orden + 1) or self.frecuencia_corte >= fs / 2:
+            return t, f
+        sos = butter(self.orden, self.frecuencia_corte, fs=fs, output='sos')
+        return t, sosfiltfilt(sos, f)
+
+
+def _sin_repetidos(t, f, t_anterior=-np.inf):
+    # Tiempo_ms repite valores a menudo; se queda la primera muestra de cada instante, que
+    # es la que ya conoce el streaming cuando la repetida llega en el bloque siguiente
+    nuevas = np.diff(t, prepend=t_anterior) > 0
+    return t[nuevas], f[nuevas]
+
+
+class Remuestreo(Etapa):
+    """Interpola sobre una rejilla uniforme de 'frecuencia' Hz (por defecto, la mediana de la grabación).
+
+    En streaming, sin 'frecuencia', el periodo se fija con el primer bloque y puede diferir
+    de la mediana de toda la grabación; con 'frecuencia' la salida coincide con procesar().
+    """
+
+    def __init__(self, frecuencia=None):
+        self.frecuencia = frecuencia
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._siguiente = None
+        self._ultimo = None
+        self._dt = None if self.frecuencia is None else 1.0 / self.frecuencia
+
+    def procesar(self, t, f):
+        t, f = _sin_repetidos(t, f)
+        if len(t) < 2:
+            return t, f
+        dt = 1.0 / self.frecuencia if self.frecuencia else _periodo(t)
+        n = int(np.floor((t[-1] - t[0]) / dt + 1e-9)) + 1
+        rejilla = t[0] + dt * np.arange(n)
+        return rejilla, np.interp(rejilla, t, f)
+
+    def bloque(self, t, f):
+        t, f = _sin_repetidos(t, f, self._ultimo[0] if self._ultimo is not None else -np.inf)
+        if len(t) == 0:
+            return _VACIO
+        if self._ultimo is not None:
+            t = np.concatenate(([self._ultimo[0]], t))
+            f = np.concatenate(([self._ultimo[1]], f))
+        if self._dt is None:
+            if len(t) < 2:
+                self._ultimo = (t[-1], f[-1])
+                return _VACIO
+            self._dt = _periodo(t)  # Se fija con el primer bloque
+        if self._siguiente is None:
+            self._siguiente = t[0]
+        n = int(np.floor((t[-1] - self._siguiente) / self._dt + 1e-9)) + 1
+        self._ultimo = (t[-1], f[-1])
+        if n <= 0:
+            return _VACIO
+        rejilla = self._siguiente + self._dt * np.arange(n)
+        self._siguiente = rejilla[-1] + self._dt
+        return rejilla, np.interp(rejilla, t, f)
+
+
+class CorreccionDeriva(Etapa):
+    """Resta la línea base de la celda de carga.
+
+    En bloque se mide antes de la ignición y, si hay tramo tras el apagado, también allí,
+    corrigiendo una deriva lineal entre ambos. En streaming se usa la media de las
+    muestras previas a la ignición (primer cruce de 'umbral_ignicion' N sobre la base).
+    """
+
+    def __init__(self, umbral_ignicion=2.0, margen=5):
+        self.umbral_ignicion = umbral_ignicion
+        self.margen = margen
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._suma = 0.0
+        self._n = 0
+        self._encendido = False
+
+    def procesar(self, t, f):
+        base_pre = np.median(f[:max(len(f) // 20, 1)])
+        sobre = np.flatnonzero(f - base_pre > self.umbral_ignicion)
+        if len(sobre) == 0:
+            return t, f - base_pre
+        i_ign, i_fin = sobre[0], sobre[-1]
+        pre = f[:max(i_ign - self.margen, 1)]
+        post = f[min(i_fin + self.margen, len(f) - 1) + 1:]
+        base_pre = np.mean(pre)
+        if len(post) < 2:
+            return t, f - base_pre
+        # Deriva lineal entre el centro del tramo previo y el del tramo posterior
+        t_pre = np.mean(t[:len(pre)])
+        t_post = np.mean(t[len(f) - len(post):])
+        pendiente = (np.mean(post) - base_pre) / (t_post - t_pre)
+        return t, f - (base_pre + pendiente * (t - t_pre))
+
+    def bloque(self, t, f):
+        if len(t) == 0:
+            return _VACIO
+        if not self._encendido:
+            base = self._suma / self._n if self._n else f[0]
+            sobre = np.flatnonzero(f - base > self.umbral_ignicion)
+            previas = f[:sobre[0]] if len(sobre) else f
+            self._suma += float(np.sum(previas))
+            self._n += len(previas)
+            self._encendido = len(sobre) > 0
+        base = self._suma / self._n if self._n else 0.0
+        return t, f - base
+
+
+class DetectorQuemado(Etapa):
+    """Detecta ignición (primer cruce del 5 % del pico) y apagado (último cruce del 10 %).
+
+    Con 'recortar' devuelve solo el tramo de quemado. Tras procesar(), los atributos
+    't_ignicion' y 't_apagado' guardan los instantes detectados. En streaming el pico es
+    el máximo hasta el momento y no se recorta; 't_apagado' se actualiza con cada bloque.
+    """
+
+    def __init__(self, umbral_ignicion=FRACCION_IGNICION, umbral_apagado=FRACCION_APAGADO, recortar=True,
+                 umbral_minimo=UMBRAL_FUERZA_N):
+        self.umbral_ignicion = umbral_ignicion
+        self.umbral_apagado = umbral_apagado
+        self.recortar = recortar
+        self.umbral_minimo = umbral_minimo
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.t_ignicion = None
+        self.t_apagado = None
+        self._pico = 0.0
+
+    def procesar(self, t, f):
+        self.reiniciar()
+        if len(f) == 0:
+            return t, f
+        self._pico = float(f.max())
+        tramo = tramo_quemado(f, self.umbral_ignicion, self.umbral_apagado, self.umbral_minimo)
+        if tramo is None:
+            return (t[:0], f[:0]) if self.recortar else (t, f)
+        inicio, fin = tramo
+        self.t_ignicion, self.t_apagado = float(t[inicio]), float(t[fin])
+        if self.recortar:
+            return t[inicio:fin + 1], f[inicio:fin + 1]
+        return t, f
+
+    def bloque(self, t, f):
+        if len(t) == 0:
+            return _VACIO
+        # Pico acumulado hasta cada muestra, para no depender del futuro
+        pico = np.maximum.accumulate(np.concatenate(([self._pico], f)))[1:]
+        self._pico = float(pico[-1])
+        if self.t_ignicion is None:
+            ign = np.flatnonzero(f >= np.maximum(self.umbral_ignicion * pico, self.umbral_minimo))
+            if len(ign):
+                self.t_ignicion = float(t[ign[0]])
+        apg = np.flatnonzero(f >= np.maximum(self.umbral_apagado * pico, self.umbral_minimo))
+        if len(apg):
+            self.t_apagado = float(t[apg[-1]])
+        return t, f
+
+
+class Preprocesado:
+    """Encadena etapas. procesar() para una grabación completa; bloque()/finalizar() en streaming."""
+
+    def __init__(self, etapas):
+        self.etapas = list(etapas)
+
+    def procesar(self, t, f):
+        t = np.asarray(t, dtype=float)
+        f = np.asarray(f, dtype=float)
+        for etapa in self.etapas:
+            t, f = etapa.procesar(t, f)
+        return t, f
+
+    def bloque(self, t, f):
+        t = np.asarray(t, dtype=float)
+        f = np.asarray(f, dtype=float)
+        for etapa in self.etapas:
+            t, f = etapa.bloque(t, f)
+        return t, f
+
+    def finalizar(self):
+        # Lo que vacía cada etapa atraviesa las siguientes, que después se vacían a su vez
+        t, f = _VACIO
+        for etapa in self.etapas:
+            t1, f1 = etapa.bloque(t, f)
+            t2, f2 = etapa.finalizar()
+            t, f = np.concatenate((t1, t2)), np.concatenate((f1, f2))
+        return t, f
+
+    def reiniciar(self):
+        for etapa in self.etapas:
+            etapa.reiniciar()
+
+
+def preprocesado_por_defecto(frecuencia_corte=20.0):
+    return Preprocesado([
+        RechazoAtipicos(),
+        CorreccionDeriva(),
+        Remuestreo(),
+        FiltroButterworth(frecuencia_corte),
+        DetectorQuemado()
+    ])
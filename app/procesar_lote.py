@@ -0,0 +1,135 @@
+# ===== Procesamiento por lotes desde la línea de comandos =====
+# Analiza todos los CSV (o .bpm con --patron '*.bpm') grabados en un directorio sin abrir
+# la interfaz gráfica.
+# Uso:
+#   python app/procesar_lote.py carpeta_csv --masa-total 5.0 --masa-prop 0.4 -o resumen.csv
+import time
+_t_inicio = time.perf_counter()
+
+import argparse
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from analisis import leer_datos, calcular_resultados, MODELOS_MASA
+from trayectoria import simular_vuelo, area_referencia
+from campana import Campana, traza_reducida
+from procesamiento import preprocesado_por_defecto
+
+COLUMNAS_RESUMEN = [
+    'archivo', 'muestras', 'empuje_max', 'impulso_total', 'tiempo_quemado',
+    'masa_propelente', 'masa_estructura', 'Isp', 'vel_final', 'apogeo',
+    'tiempo_apogeo', 'aceleracion_max', 'relacion_empuje_peso',
+    'apogeo_simulado', 'tiempo_apogeo_simulado', 'vel_max_simulada', 'error'
+]
+
+
+def analizar_archivo(archivo, masa_total, masa_prop, modelo_masa='lineal', cd=0.5, diametro=0.08,
+                     con_traza=False, frecuencia_corte=None, simular=False):
+    """Analiza un CSV y devuelve una fila para la tabla resumen (nunca lanza excepción).
+
+    Con 'con_traza' la fila incluye además la traza reducida para la campaña.
+    Con 'frecuencia_corte' (Hz) la señal pasa antes por preprocesado_por_defecto.
+    Con 'simular' añade el apogeo de simular_vuelo (gravedad y arrastre), que cuesta
+    bastante más que el resto del análisis.
+    """
+    fila = {'archivo': archivo}
+    try:
+        preprocesado = preprocesado_por_defecto(frecuencia_corte) if frecuencia_corte else None
+        _, tiempo, fuerza = leer_datos(archivo, preprocesado)
+        if len(tiempo) < 2:
+            raise ValueError("sin muestras de empuje suficientes")
+        calculos, _ = calcular_resultados(tiempo, fuerza, masa_total, masa_prop, modelo_masa)
+        fila['muestras'] = len(tiempo)
+        fila.update({k: float(v) for k, v in calculos.items()})
+        if simular:
+            vuelo = simular_vuelo(tiempo, fuerza, masa_total, masa_prop, cd, area_referencia(diametro), modelo_masa)
+            fila['apogeo_simulado'] = vuelo['apogeo']
+            fila['tiempo_apogeo_simulado'] = vuelo['tiempo_apogeo']
+            fila['vel_max_simulada'] = vuelo['vel_max']
+        if con_traza:
+            fila['traza'] = traza_reducida(tiempo, fuerza)
+    except Exception as e:
+        fila['muestras'] = 0
+        fila['error'] = str(e)
+    return fila
+
+
+def buscar_csv(directorio, patron, recursivo):
+    ruta = os.path.join(directorio, '**', patron) if recursivo else os.path.join(directorio, patron)
+    return sorted(glob.glob(ruta, recursive=recursivo))
+
+
+def escribir_resumen(filas, salida):
+    with open(salida, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNAS_RESUMEN, extrasaction='ignore')
+        writer.writeheader()
+        for fila in filas:
+            writer.writerow(fila)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analiza en paralelo todos los CSV de un directorio.")
+    parser.add_argument('directorio', help="Carpeta con las grabaciones (CSV Tiempo_ms,Fuerza_kg o .bpm)")
+    parser.add_argument('--masa-total', type=float, default=5.0, help="Masa del cohete con combustible (kg)")
+    parser.add_argument('--masa-prop', type=float, default=0.4, help="Masa del propelente (kg)")
+    parser.add_argument('--modelo-masa', choices=list(MODELOS_MASA), default='lineal',
+                        help="Modelo de consumo de propelente")
+    parser.add_argument('--simular', action='store_true',
+                        help="Simular además el vuelo con gravedad y arrastre (columnas *_simulad*)")
+    parser.add_argument('--cd', type=float, default=0.5, help="Coeficiente de arrastre para la simulación de vuelo")
+    parser.add_argument('--diametro', type=float, default=0.08, help="Diámetro del cohete (m)")
+    parser.add_argument('-o', '--salida', default='resumen.csv', help="Archivo CSV de resumen")
+    parser.add_argument('-j', '--procesos', type=int, default=None, help="Número de procesos (por defecto, todos los núcleos)")
+    parser.add_argument('--patron', default='*.csv', help="Patrón de archivos a analizar")
+    parser.add_argument('-r', '--recursivo', action='store_true', help="Buscar también en subcarpetas")
+    parser.add_argument('--campana', metavar='DB', help="Registrar las corridas en esta base de datos de campaña")
+    parser.add_argument('--preprocesar', type=float, nargs='?', const=20.0, default=None, metavar='HZ',
+                        help="Filtrar la señal, corregir la deriva y recortar al quemado "
+                             "(paso bajo a HZ, por defecto 20 Hz)")
+    args = parser.parse_args(argv)
+
+    archivos = buscar_csv(args.directorio, args.patron, args.recursivo)
+    archivos = [a for a in archivos if os.path.abspath(a) != os.path.abspath(args.salida)]
+    if not archivos:
+        print(f"No se encontraron archivos '{args.patron}' en {args.directorio}")
+        return 1
+
+    t_arranque = time.perf_counter() - _t_inicio
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        filas = list(pool.map(analizar_archivo, archivos,
+                              [args.masa_total] * len(archivos),
+                              [args.masa_prop] * len(archivos),
+                              [args.modelo_masa] * len(archivos),
+                              [args.cd] * len(archivos),
+                              [args.diametro] * len(archivos),
+                              [bool(args.campana)] * len(archivos),
+                              [args.preprocesar] * len(archivos),
+                              [args.simular] * len(archivos),
+                              chunksize=max(1, len(archivos) // 64)))
+    t_analisis = time.perf_counter() - t0
+
+    escribir_resumen(filas, args.salida)
+    if args.campana:
+        with Campana(args.campana) as campana:
+            for fila in filas:
+                if not fila.get('error'):
+                    campana.registrar(fila['archivo'], fila, args.masa_total, args.masa_prop, args.modelo_masa,
+                                      traza=fila['traza'], muestras=fila['muestras'])
+
+    errores = [f for f in filas if f.get('error')]
+    muestras = sum(f['muestras'] for f in filas)
+    for f in errores:
+        print(f"Error en {f['archivo']}: {f['error']}")
+    print(f"Resumen escrito en {args.salida} ({len(filas) - len(errores)} correctos, {len(errores)} con error)")
+    print(f"Arranque: {t_arranque * 1000:.0f} ms")
+    print(f"Análisis: {t_analisis:.2f} s -> {len(filas) / t_analisis:.1f} archivos/s, "
+          f"{muestras / t_analisis:,.0f} muestras/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
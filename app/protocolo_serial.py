@@ -0,0 +1,184 @@
+# ===== Protocolo serie con el Arduino =====
+# Dos formatos de transmisión:
+#   - 'ascii':   líneas de texto "Tiempo_ms,Fuerza_kg" a 9600 baudios (formato original).
+#   - 'binario': tramas fijas empaquetadas a 115200 baudios, ver hx711_empuje.ino:
+#       0xAA 0x55 | seq (uint16) | t_ms (uint32) | kg (float32) | chk (uint8)
+#     little-endian, chk = XOR de los bytes de seq, t_ms y kg.
+# Los lectores leen bloques completos del puerto con ser.read(n) y devuelven arrays numpy.
+import numpy as np
+
+SYNC = (0xAA, 0x55)
+DTYPE_TRAMA = np.dtype([
+    ('sync', '<u2'),
+    ('seq', '<u2'),
+    ('t_ms', '<u4'),
+    ('kg', '<f4'),
+    ('chk', 'u1')
+])
+TAM_TRAMA = DTYPE_TRAMA.itemsize
+_OFFSETS = np.arange(TAM_TRAMA)
+
+BAUDIOS = {
+    'ascii': 9600,
+    'binario': 115200
+}
+ENCABEZADO_CSV = "Tiempo_ms,Fuerza_kg"
+AVISO_TARE = ">>> TARE solicitado"  # El sketch lo envía al pulsar el botón de tara
+# Líneas de texto que envía el sketch y no son datos: se muestran pero no cuentan como corruptas
+MENSAJES_SKETCH = (ENCABEZADO_CSV, AVISO_TARE)
+
+
+def codificar_tramas(t_ms, kg, seq_inicial=0):
+    """Empaqueta muestras en tramas binarias (lo mismo que hace el sketch). Útil para pruebas."""
+    t_ms = np.asarray(t_ms, dtype=np.uint32)
+    tramas = np.zeros(len(t_ms), dtype=DTYPE_TRAMA)
+    tramas['sync'] = SYNC[0] | (SYNC[1] << 8)
+    tramas['seq'] = (seq_inicial + np.arange(len(t_ms))) & 0xFFFF
+    tramas['t_ms'] = t_ms
+    tramas['kg'] = kg
+    crudo = tramas.view(np.uint8).reshape(-1, TAM_TRAMA)
+    crudo[:, -1] = np.bitwise_xor.reduce(crudo[:, 2:-1], axis=1)
+    return tramas.tobytes()
+
+
+def formatear_csv(t_ms, kg):
+    """Convierte muestras a líneas 'Tiempo_ms,Fuerza_kg' (sin salto final)."""
+    return "\n".join(f"{t},{k:.4f}" for t, k in zip(t_ms.tolist(), kg.tolist()))
+
+
+class LectorBinario:
+    """Decodifica tramas binarias sobre un buffer preasignado.
+
+    Cuenta las tramas recibidas, las perdidas (saltos en el contador de secuencia)
+    y las corruptas (bytes descartados por sincronismo o checksum incorrecto).
+    """
+    modo = 'binario'
+
+    def __init__(self, capacidad=1 << 16):
+        self._buf = np.empty(max(capacidad, 2 * TAM_TRAMA), dtype=np.uint8)
+        self._n = 0
+        self._ultima_seq = None
+        self._descartando = False
+        self.tramas_ok = 0
+        self.tramas_perdidas = 0
+        self.tramas_corruptas = 0
+
+    def procesar(self, datos):
+        """Añade bytes recibidos y devuelve (t_ms, kg, mensajes) de las tramas completas."""
+        datos = np.frombuffer(datos, dtype=np.uint8)
+        partes_t, partes_kg = [], []
+        while len(datos):
+            cabe = min(len(datos), len(self._buf) - self._n)
+            self._buf[self._n:self._n + cabe] = datos[:cabe]
+            self._n += cabe
+            datos = datos[cabe:]
+            t_ms, kg = self._decodificar()
+            partes_t.append(t_ms)
+            partes_kg.append(kg)
+        if not partes_t:
+            return np.empty(0, np.uint32), np.empty(0, np.float32), []
+        return np.concatenate(partes_t), np.concatenate(partes_kg), []
+
+    def estadisticas(self):
+        return {
+            'ok': self.tramas_ok,
+            'perdidas': self.tramas_perdidas,
+            'corruptas': self.tramas_corruptas
+        }
+
+    def _decodificar(self):
+        n = self._n
+        datos = self._buf[:n]
+        cand = np.flatnonzero((datos[:-1] == SYNC[0]) & (datos[1:] == SYNC[1]))
+        cand = cand[cand <= n - TAM_TRAMA]
+        if len(cand):
+            crudo = datos[cand[:, None] + _OFFSETS]
+            validas = np.bitwise_xor.reduce(crudo[:, 2:-1], axis=1) == crudo[:, -1]
+            cand, crudo = cand[validas], crudo[validas]
+        if len(cand) > 1 and np.any(np.diff(cand) < TAM_TRAMA):
+            # Caso raro: un falso sincronismo dentro de una trama con checksum válido
+            sel = self._sin_solapes(cand)
+            cand, crudo = cand[sel], crudo[sel]
+
+        # Regiones descartadas: antes de la primera trama, entre tramas y al final
+        # (bytes que ya no pueden empezar una trama completa).
+        fin = cand[-1] + TAM_TRAMA if len(cand) else 0
+        conservar = max(fin, n - TAM_TRAMA + 1)
+        inicios = np.concatenate((cand, [conservar]))
+        finales = np.concatenate(([0], cand + TAM_TRAMA))
+        huecos = (inicios - finales) > 0
+        if len(huecos) and huecos[0] and self._descartando:
+            huecos[0] = False  # continúa una región descartada en la lectura anterior
+        self.tramas_corruptas += int(np.count_nonzero(huecos))
+        self._descartando = conservar > fin
+
+        # Conserva los bytes de una posible trama incompleta
+        resto = n - conservar
+        self._buf[:resto] = self._buf[conservar:n]
+        self._n = resto
+
+        if not len(cand):
+            return np.empty(0, np.uint32), np.empty(0, np.float32)
+        tramas = crudo.reshape(-1).view(DTYPE_TRAMA)
+        seq = tramas['seq']
+        previa = int(seq[0]) - 1 if self._ultima_seq is None else self._ultima_seq
+        saltos = np.diff(np.concatenate(([previa], seq)).astype(np.int64)) % 65536
+        self.tramas_perdidas += int(np.sum(saltos[saltos > 1] - 1))
+        self._ultima_seq = int(seq[-1])
+        self.tramas_ok += len(tramas)
+        return tramas['t_ms'].copy(), tramas['kg'].copy()
+
+    @staticmethod
+    def _sin_solapes(cand):
+        sel = np.zeros(len(cand), dtype=bool)
+        siguiente_libre = -1
+        for i, c in enumerate(cand):
+            if c >= siguiente_libre:
+                sel[i] = True
+                siguiente_libre = c + TAM_TRAMA
+        return sel
+
+
+class LectorAscii:
+    """Lector del formato de texto original 'Tiempo_ms,Fuerza_kg' línea a línea."""
+    modo = 'ascii'
+
+    def __init__(self):
+        self._pendiente = b""
+        self.lineas_ok = 0
+        self.lineas_invalidas = 0
+
+    def procesar(self, datos):
+        """Devuelve (t_ms, kg, mensajes); los mensajes son las líneas que no son datos."""
+        lineas = (self._pendiente + datos).split(b"\n")
+        self._pendiente = lineas.pop()
+        t_ms, kg, mensajes = [], [], []
+        for linea in lineas:
+            texto = linea.decode(errors="ignore").strip()
+            if not texto:
+                continue
+            try:
+                t, k = texto.split(",")
+                t_ms.append(int(t))
+                kg.append(float(k))
+            except ValueError:
+                if texto not in MENSAJES_SKETCH:
+                    self.lineas_invalidas += 1
+                mensajes.append(texto)
+        self.lineas_ok += len(t_ms)
+        return np.array(t_ms, dtype=np.uint32), np.array(kg, dtype=np.float32), mensajes
+
+    def estadisticas(self):
+        return {
+            'ok': self.lineas_ok,
+            'perdidas': 0,
+            'corruptas': self.lineas_invalidas
+        }
+
+
+def crear_lector(modo):
+    if modo == 'binario':
+        return LectorBinario()
+    if modo == 'ascii':
+        return LectorAscii()
+    raise ValueError(f"Modo serie desconocido: {modo!r}")
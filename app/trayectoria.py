@@ -0,0 +1,281 @@
+# ===== Simulación de vuelo vertical (1-D) =====
+# Integra h'' = (F(t) - m(t) g - D) / m(t) desde la rampa hasta el apogeo, con
+#   F(t): curva de empuje medida, con el interpolador en caché de motor.interpolador_empuje
+#         (lineal por defecto, o 'pchip', 'akima', 'spline'), cero fuera del quemado
+#   m(t): modelo de masa de analisis.MODELOS_MASA
+#   D = 1/2 rho(h) Cd A v|v|: arrastre con densidad atmosférica según la altura
+# simular_vuelo usa un integrador de paso adaptativo (scipy.integrate.solve_ivp).
+# simular_lote integra miles de combinaciones de parámetros a la vez: cada paso de
+# tiempo es una sola operación numpy sobre todas las combinaciones.
+# Uso (barrido masa total × Cd de una grabación; un rango es 'inicio:fin:pasos'):
+#   python app/trayectoria.py grabacion.csv --masa-prop 0.4 --masa-total 3:6:31 \
+#       --cd 0.3:0.7:9 --diametro 0.08 -o barrido.csv
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from analisis import G, obtener_modelo_masa
+from motor import interpolador_empuje
+
+RHO_0 = 1.225     # kg/m³ a nivel del mar
+T_0 = 288.15      # K
+GRADIENTE_T = 0.0065  # K/m en la troposfera
+EXPONENTE_ISA = G / (287.05 * GRADIENTE_T) - 1
+PASOS_MIN_QUEMADO = 50  # simular_vuelo da al menos estos pasos durante el empuje
+
+
+def densidad_isa(h):
+    """Densidad del aire (kg/m³) de la atmósfera estándar en la troposfera (h < 11 km)."""
+    h = np.clip(h, 0.0, 11000.0)
+    return RHO_0 * (1 - GRADIENTE_T * h / T_0) ** EXPONENTE_ISA
+
+
+def area_referencia(diametro):
+    return np.pi * (np.asarray(diametro, dtype=float) / 2) ** 2
+
+
+def fraccion_consumida(tiempo, fuerza, modelo_masa='lineal'):
+    """Fracción de propelente consumida en cada muestra (0 al inicio, 1 al final).
+
+    Los modelos de masa son lineales en las masas, así que basta evaluarlos una vez
+    con masas unitarias y reutilizar la fracción para cualquier combinación de masas.
+    """
+    return 1.0 - obtener_modelo_masa(modelo_masa)(tiempo, fuerza, 1.0, 1.0)
+
+
+def _preparar_curva(tiempo, fuerza, modelo_masa):
+    tiempo = np.asarray(tiempo, dtype=float)
+    fuerza = np.asarray(fuerza, dtype=float)
+    fraccion = fraccion_consumida(tiempo, fuerza, modelo_masa)
+    return tiempo - tiempo[0], fuerza, fraccion
+
+
+def simular_vuelo(tiempo, fuerza, masa_total_inicial, masa_propelente, cd=0.5, area=0.0,
+                  modelo_masa='lineal', densidad=densidad_isa, rtol=1e-6, atol=1e-6,
+                  interpolacion='lineal'):
+    """Simula el vuelo vertical hasta el apogeo con paso adaptativo.
+
+    Devuelve un diccionario con apogeo, tiempos y velocidades clave, y las series
+    't', 'altura' y 'velocidad' de la solución.
+    """
+    t_curva, f_curva, fraccion = _preparar_curva(tiempo, fuerza, modelo_masa)
+    t_quemado = t_curva[-1]
+    masa_estructura = masa_total_inicial - masa_propelente
+    k_arrastre = 0.5 * cd * area
+    empuje_t = interpolador_empuje(t_curva, f_curva, interpolacion)
+
+    def derivadas(t, y):
+        h, v = y
+        if t <= t_quemado:
+            empuje = empuje_t(t)
+            masa = masa_total_inicial - masa_propelente * np.interp(t, t_curva, fraccion)
+        else:
+            empuje = 0.0
+            masa = masa_estructura
+        a = (empuje - k_arrastre * densidad(h) * v * abs(v)) / masa - G
+        if h <= 0 and v <= 0 and a < 0:
+            a = 0.0  # Sigue apoyado en la rampa mientras el empuje no supera el peso
+        return [v, a]
+
+    # Fase propulsada: el control de error elige el paso. Solo se acota a una fracción del
+    # quemado para no saltarse un pico corto; acotarlo al intervalo de muestreo costaba un
+    # paso de Python por muestra (segundos en grabaciones largas).
+    # Un cohete pesado puede frenar antes del apagado: el evento marca esos máximos de altura
+    def frena(t, y):
+        return y[1]
+    frena.direction = -1
+    quemado = solve_ivp(derivadas, (0.0, t_quemado), [0.0, 0.0], rtol=rtol, atol=atol,
+                        max_step=max(t_quemado / PASOS_MIN_QUEMADO, 1e-4), events=frena)
+    t_max_quemado = np.concatenate((quemado.t, quemado.t_events[0]))
+    h_max_quemado = np.concatenate((quemado.y[0], quemado.y_events[0][:, 0] if len(quemado.t_events[0]) else []))
+    i = int(np.argmax(h_max_quemado))
+    t_apogeo, h_apogeo = t_max_quemado[i], h_max_quemado[i]
+
+    # Fase balística: paso libre hasta que la velocidad cruza cero hacia abajo
+    def apogeo(t, y):
+        return y[1]
+    apogeo.terminal = True
+    apogeo.direction = -1
+    h_apagado, v_apagado = quemado.y[:, -1]
+    if v_apagado > 0:
+        t_max = t_quemado + 2 * v_apagado / G + 10.0
+        costa = solve_ivp(derivadas, (t_quemado, t_max), [h_apagado, v_apagado], rtol=rtol, atol=atol,
+                          events=apogeo, dense_output=False)
+        t_ev = costa.t_events[0]
+        t_costa = t_ev[0] if len(t_ev) else costa.t[-1]
+        h_costa = costa.y_events[0][0][0] if len(t_ev) else costa.y[0, -1]
+        if h_costa >= h_apogeo:
+            t_apogeo, h_apogeo = t_costa, h_costa
+        t_sol = np.concatenate((quemado.t, costa.t[1:]))
+        y_sol = np.concatenate((quemado.y, costa.y[:, 1:]), axis=1)
+    else:
+        t_sol, y_sol = quemado.t, quemado.y
+
+    return {
+        'apogeo': float(h_apogeo),
+        'tiempo_apogeo': float(t_apogeo),
+        'vel_max': float(y_sol[1].max()),
+        'vel_apagado': float(v_apagado),
+        'altura_apagado': float(h_apagado),
+        't': t_sol,
+        'altura': y_sol[0],
+        'velocidad': y_sol[1]
+    }
+
+
+def simular_lote(tiempo, fuerza, masa_total_inicial, masa_propelente, cd=0.5, area=0.0,
+                 modelo_masa='lineal', densidad=densidad_isa, dt_quemado=None, dt_costa=0.01,
+                 interpolacion='lineal'):
+    """Simula a la vez todas las combinaciones de parámetros.
+
+    masa_total_inicial, masa_propelente, cd y area pueden ser escalares o arrays que
+    se combinan por broadcasting (por ejemplo, una malla Cd × masa aplanada).
+    Integra con Runge-Kutta 4 de paso fijo: 'dt_quemado' durante el empuje (por defecto
+    el intervalo mediano de la curva) y 'dt_costa' en la fase balística. Como los pasos
+    del quemado son fijos, el empuje se evalúa una sola vez en todos los nodos del RK4.
+    Devuelve arrays con la forma del broadcasting: 'apogeo', 'tiempo_apogeo', 'vel_max'
+    y 'vel_apagado'.
+    """
+    t_curva, f_curva, fraccion = _preparar_curva(tiempo, fuerza, modelo_masa)
+    t_quemado = t_curva[-1]
+    m0, mp, cd, area = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                             (masa_total_inicial, masa_propelente, cd, area)))
+    forma = m0.shape
+    m0, mp, k = m0.ravel(), mp.ravel(), 0.5 * (cd * area).ravel()
+    n = m0.size
+
+    if dt_quemado is None:
+        dt_quemado = max(float(np.median(np.diff(t_curva))), 1e-4) if len(t_curva) > 1 else dt_costa
+
+    # Instantes de cada paso del quemado (el último se acorta para acabar en el apagado); el
+    # empuje y la fracción consumida se evalúan de una vez en los nodos y puntos medios
+    inicios = np.arange(0.0, t_quemado, dt_quemado)
+    finales = np.append(inicios[1:], t_quemado)
+    nodos = np.stack((inicios, (inicios + finales) / 2, finales))
+    empuje_nodos = interpolador_empuje(t_curva, f_curva, interpolacion)(nodos)
+    fraccion_nodos = np.interp(nodos, t_curva, fraccion)
+
+    def aceleracion(empuje, fraccion_t, h, v):
+        a = (empuje - k * densidad(h) * v * np.abs(v)) / (m0 - mp * fraccion_t) - G
+        return np.where((h <= 0) & (v <= 0) & (a < 0), 0.0, a)
+
+    h = np.zeros(n)
+    v = np.zeros(n)
+    activo = np.ones(n, dtype=bool)
+    apogeo = np.zeros(n)
+    t_apogeo = np.zeros(n)
+    vel_max = np.zeros(n)
+    vel_apagado = np.zeros(n)
+    t = 0.0
+    t_limite = t_quemado + 600.0
+    paso = 0
+    while t < t_limite:
+        if paso < len(inicios):
+            t, t_nuevo = inicios[paso], finales[paso]
+            (f1, f2, f4), (x1, x2, x4) = empuje_nodos[:, paso], fraccion_nodos[:, paso]
+        else:
+            t_nuevo = t + dt_costa
+            f1 = f2 = f4 = 0.0
+            x1 = x2 = x4 = 1.0
+        dt = t_nuevo - t
+        paso += 1
+        # RK4 vectorizado sobre todas las combinaciones
+        k1v = aceleracion(f1, x1, h, v)
+        k1h = v
+        k2v = aceleracion(f2, x2, h + dt / 2 * k1h, v + dt / 2 * k1v)
+        k2h = v + dt / 2 * k1v
+        k3v = aceleracion(f2, x2, h + dt / 2 * k2h, v + dt / 2 * k2v)
+        k3h = v + dt / 2 * k2v
+        k4v = aceleracion(f4, x4, h + dt * k3h, v + dt * k3v)
+        k4h = v + dt * k3v
+        h_nueva = h + dt / 6 * (k1h + 2 * k2h + 2 * k3h + k4h)
+        v_nueva = v + dt / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+
+        vel_max = np.maximum(vel_max, np.where(activo, v_nueva, vel_max))
+
+        # Apogeo: máximo de la altura en todo el vuelo, también durante el quemado (un cohete
+        # pesado o con una cola de empuje larga puede frenar antes del apagado)
+        sube = activo & (h_nueva > apogeo)
+        apogeo[sube] = h_nueva[sube]
+        t_apogeo[sube] = t_nuevo
+        # Si la velocidad cruza cero dentro del paso, el máximo está en el cruce
+        cruza = activo & (v > 0) & (v_nueva <= 0)
+        if np.any(cruza):
+            frac = v[cruza] / (v[cruza] - v_nueva[cruza])
+            h_cruce = h[cruza] + 0.5 * v[cruza] * frac * dt
+            mejor = h_cruce > apogeo[cruza]
+            idx = np.flatnonzero(cruza)[mejor]
+            apogeo[idx] = h_cruce[mejor]
+            t_apogeo[idx] = t + frac[mejor] * dt
+        h, v, t = h_nueva, v_nueva, t_nuevo
+        if paso == len(inicios):
+            vel_apagado = v.copy()
+        if paso >= len(inicios):
+            # Tras el apagado ya solo se frena: terminan los que caen o no despegaron
+            activo &= v > 0
+            if not activo.any():
+                break
+
+    return {
+        'apogeo': apogeo.reshape(forma),
+        'tiempo_apogeo': t_apogeo.reshape(forma),
+        'vel_max': vel_max.reshape(forma),
+        'vel_apagado': vel_apagado.reshape(forma)
+    }
+
+
+# ===== Barrido de parámetros desde la línea de comandos =====
+COLUMNAS_BARRIDO = ['masa_total', 'masa_propelente', 'cd', 'diametro',
+                    'apogeo', 'tiempo_apogeo', 'vel_max', 'vel_apagado']
+
+
+def rango(texto):
+    """'5' -> [5.0]; 'inicio:fin:pasos' -> pasos valores equiespaciados."""
+    partes = texto.split(':')
+    if len(partes) == 1:
+        return np.array([float(texto)])
+    if len(partes) != 3:
+        raise argparse.ArgumentTypeError(f"rango no válido: {texto!r} (usa 'inicio:fin:pasos')")
+    return np.linspace(float(partes[0]), float(partes[1]), int(partes[2]))
+
+
+def main(argv=None):
+    from analisis import leer_datos, MODELOS_MASA
+    parser = argparse.ArgumentParser(description="Simula el vuelo de una grabación para todas las "
+                                                 "combinaciones de masas, Cd y diámetro.")
+    parser.add_argument('entrada', help="Grabación (.csv o .bpm)")
+    parser.add_argument('--masa-total', type=rango, default=rango('5.0'), help="Masa inicial del cohete (kg)")
+    parser.add_argument('--masa-prop', type=rango, default=rango('0.4'), help="Masa del propelente (kg)")
+    parser.add_argument('--cd', type=rango, default=rango('0.5'), help="Coeficiente de arrastre")
+    parser.add_argument('--diametro', type=rango, default=rango('0.08'), help="Diámetro del cohete (m)")
+    parser.add_argument('--modelo-masa', choices=list(MODELOS_MASA), default='lineal',
+                        help="Modelo de consumo de propelente")
+    parser.add_argument('-o', '--salida', default=None, help="CSV con el resultado de cada combinación")
+    args = parser.parse_args(argv)
+
+    _, tiempo, fuerza = leer_datos(args.entrada)
+    malla = [m.ravel() for m in np.meshgrid(args.masa_total, args.masa_prop, args.cd, args.diametro,
+                                            indexing='ij')]
+    masa_total, masa_prop, cd, diametro = malla
+    t0 = time.perf_counter()
+    vuelo = simular_lote(tiempo, fuerza, masa_total, masa_prop, cd, area_referencia(diametro), args.modelo_masa)
+    duracion = time.perf_counter() - t0
+
+    if args.salida:
+        with open(args.salida, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNAS_BARRIDO)
+            writer.writerows(zip(*malla, *(vuelo[c] for c in COLUMNAS_BARRIDO[4:])))
+    i = int(np.argmax(vuelo['apogeo']))
+    print(f"{len(masa_total)} combinaciones en {duracion:.2f} s")
+    print(f"Apogeo máximo {vuelo['apogeo'][i]:.1f} m con masa total {masa_total[i]:g} kg, "
+          f"propelente {masa_prop[i]:g} kg, Cd {cd[i]:g}, diámetro {diametro[i]:g} m")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,28 @@
 #define SCK 3
 #define BOTON_TARE 4
 
+// Formato de salida:
+//   0 = texto CSV "Tiempo_ms,Fuerza_kg" a 9600 baudios (compatible con versiones anteriores)
+//   1 = tramas binarias de 13 bytes a 115200 baudios (elegir "Binario" en la app)
+#define MODO_BINARIO 0
+
+#if MODO_BINARIO
+#define BAUDIOS 115200
+#else
+#define BAUDIOS 9600
+#endif
+
+// Trama binaria (little-endian): 0xAA 0x55 | secuencia | tiempo | fuerza | checksum
+// checksum = XOR de los bytes de secuencia, tiempo y fuerza
+struct __attribute__((packed)) Trama {
+  uint8_t sync1;
+  uint8_t sync2;
+  uint16_t secuencia;
+  uint32_t tiempo_ms;
+  float fuerza_kg;
+  uint8_t checksum;
+};
+
 HX711 scale;
  
 //float factor = 7100.0;  // Cambiar tras calibrar
@@ -10,23 +32,44 @@ float factor = 8658.36;  // Factor calibrado con 7.265kg
 
 unsigned long t0;
 bool tareSolicitado = false;
+uint16_t secuencia = 0;
+
+void enviarTrama(unsigned long t, float kg) {
+  Trama trama;
+  trama.sync1 = 0xAA;
+  trama.sync2 = 0x55;
+  trama.secuencia = secuencia++;
+  trama.tiempo_ms = t;
+  trama.fuerza_kg = kg;
+  const uint8_t* bytes = (const uint8_t*)&trama;
+  uint8_t chk = 0;
+  for (uint8_t i = 2; i < sizeof(Trama) - 1; i++) {
+    chk ^= bytes[i];
+  }
+  trama.checksum = chk;
+  Serial.write(bytes, sizeof(Trama));
+}
 
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(BAUDIOS);
   pinMode(BOTON_TARE, INPUT_PULLUP);  // Botón entre D4 y GND
   scale.begin(DT, SCK);
   scale.set_gain(128);  // Canal A
   scale.set_scale(factor);
   scale.tare();         // Cero inicial
   t0 = millis();
+#if !MODO_BINARIO
   Serial.println("Tiempo_ms,Fuerza_kg");  // Encabezado CSV
+#endif
 }
 
 void loop() {
   // Verificar si se presionó el botón de tare
   if (digitalRead(BOTON_TARE) == LOW && !tareSolicitado) {
     tareSolicitado = true;
+#if !MODO_BINARIO
     Serial.println(">>> TARE solicitado");
+#endif
     scale.tare();
     delay(500); // Antirebote simple
   } else if (digitalRead(BOTON_TARE) == HIGH) {
@@ -37,8 +80,12 @@ void loop() {
   if (scale.is_ready()) {
     unsigned long t = millis() - t0;
     float kg = scale.get_units(1);  // Leer una muestra
+#if MODO_BINARIO
+    enviarTrama(t, kg);
+#else
     Serial.print(t);
     Serial.print(",");
     Serial.println(kg, 4);  // Cuatro decimales
+#endif
   }
 }
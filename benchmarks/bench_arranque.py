@@ -0,0 +1,124 @@
+# ===== Benchmark del arranque de la interfaz =====
+# Mide en un proceso nuevo cada vez:
+#   importar -> tiempo de 'import ProgramaBancoPruebas' y qué dependencias pesadas arrastra
+#   ventana  -> construcción de BancoPruebas hasta el primer dibujado del menú, y el cambio
+#               menú -> pantalla -> menú (necesita pantalla: sin DISPLAY se relanza con
+#               xvfb-run si está instalado y, si no, se omite)
+# Con --base REV mide también esa revisión (en un git worktree temporal) para comparar el
+# antes y el después con la misma máquina y la misma pantalla.
+# Uso: python benchmarks/bench_arranque.py [--repeticiones 5] [--base c40b412~1]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP = os.path.join(RAIZ, 'app')
+PESADAS = ('pandas', 'matplotlib', 'scipy', 'PIL', 'serial')
+
+_IMPORTAR = """
+import json, sys, time
+t0 = time.perf_counter()
+import ProgramaBancoPruebas
+t = time.perf_counter() - t0
+print(json.dumps({'s': t, 'cargadas': [m for m in %r if m in sys.modules]}))
+""" % (PESADAS,)
+
+_VENTANA = """
+import json, sys, time
+import tkinter as tk
+import numpy as np
+tk.Tk.mainloop = lambda self, n=0: None  # Versiones antiguas llaman a mainloop() en __init__
+t0 = time.perf_counter()
+import ProgramaBancoPruebas as P
+app = P.BancoPruebas()
+app.window.update()
+arranque = time.perf_counter() - t0
+
+def medir(func):
+    t = time.perf_counter()
+    func()
+    app.window.update()
+    return time.perf_counter() - t
+
+# Quemado de 2 s a 1 kHz (sin importar sinteticos, que añadiría al path la app actual)
+t_ms = np.arange(4000, dtype=np.uint32)
+x = (t_ms - 1000) / 2000.0
+app._crudo = (t_ms, np.where((x >= 0) & (x <= 1), 10.0, 0.0).astype(np.float32))
+app.preparar_senal()
+menu, primera, otras = [], [], []
+primera.append(medir(lambda: app.plot_graph('Fuerza_N', 'Empuje (N)')))
+for _ in range(5):
+    menu.append(medir(app.create_main_menu))
+    otras.append(medir(lambda: app.plot_graph('Fuerza_N', 'Empuje (N)')))
+menu.append(medir(app.create_main_menu))
+app.window.destroy()
+print(json.dumps({'arranque': arranque, 'menu': menu, 'grafica_primera': primera[0], 'grafica': otras}))
+"""
+
+
+def ejecutar(codigo, app=APP):
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=app, capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1])
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def hay_pantalla():
+    return bool(os.environ.get('DISPLAY')) or sys.platform in ('win32', 'darwin')
+
+
+def medir(app, repeticiones, ventana):
+    importaciones = [ejecutar(_IMPORTAR, app) for _ in range(repeticiones)]
+    tiempos = [r['s'] for r in importaciones]
+    print(f"  import ProgramaBancoPruebas: mediana {statistics.median(tiempos) * 1000:.0f} ms "
+          f"(mín {min(tiempos) * 1000:.0f} ms)")
+    print(f"    dependencias cargadas al importar: {', '.join(importaciones[0]['cargadas']) or 'ninguna'}")
+    if not ventana:
+        return
+    ventanas = [ejecutar(_VENTANA, app) for _ in range(repeticiones)]
+    arranques = [v['arranque'] for v in ventanas]
+    menus = [m for v in ventanas for m in v['menu']]
+    graficas = [g for v in ventanas for g in v['grafica']]
+    print(f"  Arranque hasta el menú dibujado: mediana {statistics.median(arranques) * 1000:.0f} ms")
+    print(f"  Volver al menú: mediana {statistics.median(menus) * 1000:.1f} ms")
+    print(f"  Gráfica de empuje: primera {statistics.median([v['grafica_primera'] for v in ventanas]) * 1000:.0f} ms, "
+          f"siguientes {statistics.median(graficas) * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque y el cambio de pantallas de la interfaz.")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--base', metavar='REV', help="Revisión de git con la que comparar (p. ej. HEAD~1)")
+    args = parser.parse_args(argv)
+
+    if not hay_pantalla() and shutil.which('xvfb-run') and not os.environ.get('BENCH_XVFB'):
+        # Pantalla virtual: se relanza el benchmark completo dentro de xvfb-run
+        entorno = dict(os.environ, BENCH_XVFB='1')
+        return subprocess.call(['xvfb-run', '-a', sys.executable, os.path.abspath(__file__)] +
+                               (sys.argv[1:] if argv is None else argv), env=entorno)
+    ventana = hay_pantalla()
+    if not ventana:
+        print("Sin pantalla (DISPLAY) ni xvfb-run: se omiten las medidas de la ventana")
+
+    if args.base:
+        with tempfile.TemporaryDirectory() as carpeta:
+            arbol = os.path.join(carpeta, 'base')
+            subprocess.run(['git', 'worktree', 'add', '--detach', arbol, args.base], cwd=RAIZ,
+                           check=True, capture_output=True)
+            try:
+                print(f"[{args.base}]")
+                medir(os.path.join(arbol, 'app'), args.repeticiones, ventana)
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', arbol], cwd=RAIZ, capture_output=True)
+    print("[árbol actual]")
+    medir(APP, args.repeticiones, ventana)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# ===== Benchmark de las rutas críticas del análisis y la adquisición =====
+# Con curvas sintéticas de varias duraciones y frecuencias de muestreo mide:
+#   lectura    -> leer_datos de un CSV y de un .bpm (lo que hace cargar_csv)
+#   calculo    -> calcular_resultados (calcular_datos) y simular_vuelo (pantalla de resultados)
+#   dibujo     -> la curva de empuje decimada en una figura Agg (lo que hace plot_graph)
+#   decodificar-> LectorAscii/LectorBinario sobre el flujo en bloques como los del puerto
+#   serie      -> Adquisidor completo leyendo de un pseudoterminal que hace de Arduino
+#                 (solo en Linux/macOS), con los tiempos por etapa de MedidorEtapas
+# Uso:
+#   python benchmarks/bench_completo.py                 todas las etapas
+#   python benchmarks/bench_completo.py --etapas lectura calculo --rapido
+#   python benchmarks/bench_completo.py --perfil calculo  (cProfile de esa etapa)
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from sinteticos import curva_empuje, guardar, flujo_serial
+from analisis import leer_datos, preparar_datos, calcular_resultados
+from trayectoria import simular_vuelo, area_referencia
+from decimacion import decimar_ventana
+from protocolo_serial import crear_lector
+
+MASA_TOTAL = 5.0
+MASA_PROP = 0.4
+# (duración del quemado en s, frecuencia en Hz): celda HX711 a 80 Hz, modo binario rápido
+# y una prueba de resistencia larga
+CASOS = [(2.0, 80), (2.0, 1000), (30.0, 1000), (600.0, 80), (600.0, 1000)]
+CASOS_RAPIDOS = [(2.0, 80), (2.0, 1000), (30.0, 1000)]
+ETAPAS = ('lectura', 'calculo', 'dibujo', 'decodificar', 'serie')
+
+
+def mejor_tiempo(func, repeticiones=3):
+    """Menor tiempo de 'repeticiones' ejecuciones (s), para aislar el ruido del sistema."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def fila(nombre, n, segundos):
+    print(f"  {nombre:<26} {n:>10,} {segundos * 1000:>10.2f} ms {n / segundos:>14,.0f} muestras/s")
+
+
+def bench_lectura(casos, carpeta):
+    for duracion, hz in casos:
+        t_ms, kg = curva_empuje(duracion, hz)
+        for ext in ('.csv', '.bpm'):
+            ruta = os.path.join(carpeta, f"curva_{duracion:g}s_{hz}hz{ext}")
+            guardar(ruta, t_ms, kg)
+            fila(f"leer_datos {ext} {duracion:g}s@{hz}Hz", len(t_ms), mejor_tiempo(lambda: leer_datos(ruta)))
+
+
+def bench_calculo(casos):
+    for duracion, hz in casos:
+        t_ms, kg = curva_empuje(duracion, hz)
+        _, tiempo, fuerza = preparar_datos(t_ms, kg)
+        n = len(tiempo)
+        fila(f"calcular_resultados {duracion:g}s@{hz}Hz", n,
+             mejor_tiempo(lambda: calcular_resultados(tiempo, fuerza, MASA_TOTAL, MASA_PROP)))
+        fila(f"simular_vuelo {duracion:g}s@{hz}Hz", n,
+             mejor_tiempo(lambda: simular_vuelo(tiempo, fuerza, MASA_TOTAL, MASA_PROP, 0.5, area_referencia(0.08)),
+                          repeticiones=1))
+
+
+def bench_dibujo(casos):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    for duracion, hz in casos:
+        t_ms, kg = curva_empuje(duracion, hz)
+        _, tiempo, fuerza = preparar_datos(t_ms, kg)
+
+        def dibujar():
+            fig = Figure(figsize=(8, 4), dpi=100)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot(111)
+            ax.set_xlim(tiempo[0], tiempo[-1])
+            ax.plot(*decimar_ventana(tiempo, fuerza, tiempo[0], tiempo[-1], ax.bbox.width), lw=2)
+            fig.canvas.draw()
+        fila(f"dibujo decimado {duracion:g}s@{hz}Hz", len(tiempo), mejor_tiempo(dibujar))
+
+
+def bench_decodificar(casos, tam_bloque=4096):
+    for duracion, hz in casos:
+        t_ms, kg = curva_empuje(duracion, hz)
+        for modo in ('ascii', 'binario'):
+            flujo = flujo_serial(t_ms, kg, modo)
+
+            def decodificar():
+                lector = crear_lector(modo)
+                for i in range(0, len(flujo), tam_bloque):
+                    lector.procesar(flujo[i:i + tam_bloque])
+            fila(f"{modo} {duracion:g}s@{hz}Hz ({len(flujo) // 1024} KiB)", len(t_ms), mejor_tiempo(decodificar))
+
+
+def bench_serie(casos, carpeta):
+    """Adquisición de punta a punta: un hilo escribe el flujo en un pty a toda velocidad."""
+    try:
+        import pty
+        import tty
+    except ImportError:
+        print("  (sin pseudoterminales en este sistema; se omite)")
+        return
+    from adquisicion import Adquisidor, Dispositivo
+    from instrumentacion import MedidorEtapas
+
+    for duracion, hz in casos:
+        t_ms, kg = curva_empuje(duracion, hz)
+        for modo in ('ascii', 'binario'):
+            # La primera muestra va sola: con ella el Adquisidor fija el reloj del dispositivo y
+            # el resto, enviado de golpe, ya cuenta como posterior al inicio de la grabación
+            primera = flujo_serial(t_ms[:1], kg[:1], modo)
+            flujo = flujo_serial(t_ms[1:], kg[1:], modo, seq_inicial=1)
+            maestro, esclavo = pty.openpty()
+            tty.setraw(esclavo)
+            medidor = MedidorEtapas()
+            recibidas = [0]
+            completo = threading.Event()
+
+            def al_recibir(indice, t, f):
+                recibidas[0] += len(t)
+                if recibidas[0] >= len(t_ms):
+                    completo.set()
+
+            destino = os.path.join(carpeta, f"serie_{modo}.bpm")
+            adq = Adquisidor([Dispositivo(os.ttyname(esclavo), modo, destino)], al_recibir, medidor=medidor)
+            adq.iniciar()
+            time.sleep(0.2)  # Deja abrir el puerto antes de enviar
+            os.write(maestro, primera)
+            time.sleep(0.1)
+            medidor.resumen()
+            t0 = time.perf_counter()
+            for i in range(0, len(flujo), 4096):
+                os.write(maestro, flujo[i:i + 4096])
+            completo.wait(timeout=30)
+            segundos = time.perf_counter() - t0
+            adq.detener()
+            adq.esperar()
+            os.close(maestro)
+            os.close(esclavo)
+            fila(f"pty {modo} {duracion:g}s@{hz}Hz", recibidas[0], segundos)
+            for linea in MedidorEtapas.texto(medidor.resumen()).splitlines():
+                print(f"      {linea}")
+
+
+def ejecutar(etapa, casos, carpeta):
+    if etapa == 'lectura':
+        bench_lectura(casos, carpeta)
+    elif etapa == 'calculo':
+        bench_calculo(casos)
+    elif etapa == 'dibujo':
+        bench_dibujo(casos)
+    elif etapa == 'decodificar':
+        bench_decodificar(casos)
+    elif etapa == 'serie':
+        # La grabación en tiempo real no necesita las pruebas de 10 minutos
+        bench_serie([c for c in casos if c[0] * c[1] <= 60_000], carpeta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide las rutas críticas con curvas de empuje sintéticas.")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS))
+    parser.add_argument('--rapido', action='store_true', help="Solo las curvas cortas")
+    parser.add_argument('--perfil', choices=ETAPAS, help="Perfila una etapa con cProfile")
+    parser.add_argument('--lineas-perfil', type=int, default=20)
+    args = parser.parse_args(argv)
+    casos = CASOS_RAPIDOS if args.rapido else CASOS
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        if args.perfil:
+            perfil = cProfile.Profile()
+            perfil.runcall(ejecutar, args.perfil, casos, carpeta)
+            pstats.Stats(perfil).sort_stats('cumulative').print_stats(args.lineas_perfil)
+            return 0
+        for etapa in args.etapas:
+            print(f"[{etapa}]")
+            ejecutar(etapa, casos, carpeta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# ===== Benchmark de dibujo de la curva de empuje =====
+# Compara el dibujo original de plot_graph (ax.plot + ax.scatter de todas las muestras)
+# con la línea decimada por columnas de píxel (decimacion.decimar_ventana).
+# Se usa el backend Agg, así que mide el coste de rasterizar la figura sin Tk.
+# Uso: python benchmarks/bench_graficas.py
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from decimacion import decimar_ventana
+
+
+def curva_sintetica(n, duracion=3.0):
+    t = np.linspace(0.0, duracion, n)
+    y = 120 * np.sin(np.pi * t / duracion) ** 0.5 + np.random.default_rng(0).normal(0, 2, n)
+    return t, y
+
+
+def nueva_figura():
+    fig = Figure(figsize=(6, 3), dpi=100)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def dibujar_original(t, y):
+    fig, ax = nueva_figura()
+    ax.plot(t, y, lw=2, color='blue')
+    ax.scatter(t, y, color='blue', s=10)
+    fig.canvas.draw()
+
+
+def dibujar_decimado(t, y):
+    fig, ax = nueva_figura()
+    ax.set_xlim(t[0], t[-1])
+    td, yd = decimar_ventana(t, y, t[0], t[-1], ax.bbox.width)
+    ax.plot(td, yd, lw=2, color='blue')
+    fig.canvas.draw()
+    # Zoom al 10 % central: se vuelve a decimar desde los datos completos
+    x0 = t[0] + 0.45 * (t[-1] - t[0])
+    x1 = t[0] + 0.55 * (t[-1] - t[0])
+    ax.set_xlim(x0, x1)
+    ax.lines[0].set_data(*decimar_ventana(t, y, x0, x1, ax.bbox.width))
+    fig.canvas.draw()
+
+
+def medir(func, *args):
+    t0 = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    print(f"{'muestras':>10} {'original (s)':>13} {'decimado+zoom (s)':>18} {'aceleración':>12}")
+    for n in (10_000, 100_000, 500_000, 1_000_000):
+        t, y = curva_sintetica(n)
+        t_orig = medir(dibujar_original, t, y)
+        t_dec = medir(dibujar_decimado, t, y)
+        print(f"{n:>10,} {t_orig:>13.3f} {t_dec:>18.3f} {t_orig / t_dec:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# ===== Micro-benchmark del modelo de masa instantánea =====
+# Compara la lista por comprensión original de calcular_datos con los modelos
+# vectorizados de app/analisis.py.
+# Uso: python benchmarks/bench_masa.py
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from analisis import masa_lineal, masa_por_impulso
+
+MASA_TOTAL = 5.0
+MASA_PROP = 0.4
+
+
+def masa_lista_original(tiempo, fuerza, masa_total_inicial, masa_propelente):
+    # Implementación anterior, muestra a muestra
+    masa_estructura = masa_total_inicial - masa_propelente
+    tiempo_quemado = tiempo[-1] - tiempo[0]
+    return np.array([
+        masa_total_inicial - masa_propelente * ((t - tiempo[0]) / tiempo_quemado)
+        if (t - tiempo[0]) <= tiempo_quemado else masa_estructura
+        for t in tiempo
+    ])
+
+
+def medir(func, tiempo, fuerza, repeticiones):
+    t = timeit.timeit(lambda: func(tiempo, fuerza, MASA_TOTAL, MASA_PROP), number=repeticiones)
+    return t / repeticiones
+
+
+def main():
+    print(f"{'muestras':>10} {'lista (ms)':>12} {'lineal (ms)':>12} {'impulso (ms)':>13} {'aceleración':>12}")
+    for n in (10_000, 100_000, 1_000_000):
+        tiempo = np.linspace(0.0, 3.0, n)
+        fuerza = 100 * np.sin(np.pi * tiempo / 3.0) + 1.0
+        assert np.allclose(masa_lista_original(tiempo, fuerza, MASA_TOTAL, MASA_PROP),
+                           masa_lineal(tiempo, fuerza, MASA_TOTAL, MASA_PROP))
+        rep = max(1, 1_000_000 // n)
+        t_lista = medir(masa_lista_original, tiempo, fuerza, 1 if n >= 100_000 else 3)
+        t_lineal = medir(masa_lineal, tiempo, fuerza, rep)
+        t_impulso = medir(masa_por_impulso, tiempo, fuerza, rep)
+        print(f"{n:>10,} {t_lista * 1e3:>12.2f} {t_lineal * 1e3:>12.3f} {t_impulso * 1e3:>13.3f} "
+              f"{t_lista / t_lineal:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
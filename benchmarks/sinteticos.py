@@ -0,0 +1,68 @@
+# ===== Curvas de empuje sintéticas para los benchmarks =====
+# Generan grabaciones con el mismo aspecto que las del Arduino: Tiempo_ms entero con el
+# jitter del bucle de lectura, Fuerza_kg float32 con ruido y deriva de la celda, y un
+# tramo sin empuje antes de la ignición y después del apagado.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from protocolo_serial import ENCABEZADO_CSV, codificar_tramas, formatear_csv
+from almacenamiento import guardar_binario
+
+PERFILES = ('neutro', 'progresivo', 'regresivo', 'pico')
+
+
+def _forma(x, perfil):
+    # x en [0, 1] a lo largo del quemado; devuelve el empuje relativo (máximo 1)
+    subida = np.clip(x / 0.05, 0.0, 1.0)
+    bajada = np.clip((1.0 - x) / 0.10, 0.0, 1.0)
+    if perfil == 'neutro':
+        base = np.ones_like(x)
+    elif perfil == 'progresivo':
+        base = 0.5 + 0.5 * x
+    elif perfil == 'regresivo':
+        base = 1.0 - 0.5 * x
+    elif perfil == 'pico':
+        base = 0.6 + 0.4 * np.exp(-x / 0.05)
+    else:
+        raise ValueError(f"Perfil desconocido: {perfil!r}")
+    return base * subida * bajada
+
+
+def curva_empuje(duracion_s=2.0, frecuencia_hz=80.0, perfil='neutro', empuje_max_kg=10.0,
+                 previo_s=1.0, posterior_s=1.0, ruido_kg=0.02, deriva_kg=0.05, jitter=0.1, semilla=0):
+    """Devuelve (tiempo_ms uint32, fuerza_kg float32) de una prueba completa."""
+    rng = np.random.default_rng(semilla)
+    total_s = previo_s + duracion_s + posterior_s
+    n = max(int(total_s * frecuencia_hz), 2)
+    periodo_ms = 1000.0 / frecuencia_hz
+    pasos = periodo_ms * (1.0 + jitter * rng.uniform(-1.0, 1.0, n))
+    t_ms = np.floor(np.cumsum(pasos)).astype(np.uint32)
+    t_s = t_ms / 1000.0
+    x = (t_s - previo_s) / duracion_s
+    kg = empuje_max_kg * np.where((x >= 0) & (x <= 1), _forma(np.clip(x, 0, 1), perfil), 0.0)
+    kg += deriva_kg * t_s / total_s + rng.normal(0.0, ruido_kg, n)
+    return t_ms, kg.astype(np.float32)
+
+
+def guardar_csv(ruta, t_ms, kg):
+    with open(ruta, 'w') as f:
+        f.write(ENCABEZADO_CSV + "\n")
+        f.write(formatear_csv(t_ms, kg) + "\n")
+
+
+def guardar(ruta, t_ms, kg):
+    """Escribe la curva en .csv o .bpm según la extensión."""
+    if ruta.lower().endswith('.bpm'):
+        guardar_binario(ruta, t_ms, kg)
+    else:
+        guardar_csv(ruta, t_ms, kg)
+
+
+def flujo_serial(t_ms, kg, modo='ascii', seq_inicial=0):
+    """Bytes tal como los enviaría el sketch en el modo dado."""
+    if modo == 'binario':
+        return codificar_tramas(t_ms, kg, seq_inicial)
+    return (formatear_csv(t_ms, kg) + "\n").encode()
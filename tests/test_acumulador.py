@@ -0,0 +1,45 @@
+# ===== Pruebas del acumulador de la grabación =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from acumulador import AcumuladorEmpuje
+from analisis import G, calcular_resultados, preparar_datos
+
+MASA_TOTAL = 5.0
+MASA_PROP = 0.4
+
+
+def quemado_con_caida(semilla=0):
+    """Grabación cruda (Tiempo_ms, Fuerza_kg) con reposo, quemado con una caída a cero y cola."""
+    rng = np.random.default_rng(semilla)
+    t_ms = np.cumsum(rng.integers(1, 4, 5000)).astype(np.uint32)
+    t = t_ms / 1000.0
+    kg = np.where((t > 1.0) & (t < 8.0), 8.0 * np.exp(-(t - 1.0) / 6.0), 0.0)
+    kg[(t > 4.0) & (t < 4.3)] = 0.0  # Caída a media combustión
+    kg = kg + rng.normal(0.0, 0.03, len(t))
+    return t_ms, kg.astype(np.float32)
+
+
+@pytest.mark.parametrize('semilla', [0, 1, 2])
+def test_bloques_aleatorios_coinciden_con_calcular_resultados(semilla):
+    t_ms, kg = quemado_con_caida(semilla)
+    _, tiempo, fuerza = preparar_datos(t_ms, kg)
+    esperado, _ = calcular_resultados(tiempo, fuerza, MASA_TOTAL, MASA_PROP)
+
+    # Los mismos bloques y conversiones que recibir_muestras durante la grabación
+    acumulador = AcumuladorEmpuje(MASA_PROP)
+    rng = np.random.default_rng(100 + semilla)
+    i = 0
+    while i < len(t_ms):
+        n = int(rng.integers(1, 300))
+        acumulador.agregar_bloque(t_ms[i:i + n] / 1000.0, kg[i:i + n].astype(float) * G)
+        i += n
+    resultados = acumulador.resultados()
+
+    for clave in ('empuje_max', 'impulso_total', 'tiempo_quemado', 'Isp'):
+        assert resultados[clave] == pytest.approx(float(esperado[clave]), rel=1e-9), clave
+    assert acumulador.t_apagado is not None  # La caída se vio como apagado con histéresis
@@ -0,0 +1,37 @@
+# ===== Pruebas del reloj común de la adquisición =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+pytest.importorskip('serial')
+from adquisicion import RelojDispositivo
+
+
+@pytest.mark.parametrize('deriva_ppm', [-100.0, 0.0, 100.0])
+def test_sigue_la_deriva_del_dispositivo(deriva_ppm):
+    # 20 min con un bloque cada ~20 ms; la latencia de llegada solo suma (exponencial, media 3 ms)
+    rng = np.random.default_rng(0)
+    t_dev = np.cumsum(rng.uniform(15.0, 25.0, 60000))
+    desfase_real = 1234.5
+    t_real = desfase_real + t_dev * (1 + deriva_ppm * 1e-6)
+    llegada = t_real + rng.exponential(3.0, len(t_dev))
+
+    reloj = RelojDispositivo()
+    errores = []
+    for t, ll, real in zip(t_dev, llegada, t_real):
+        reloj.observar(t, ll)
+        errores.append(reloj.convertir(t) - real)
+    errores = np.abs(errores[len(errores) // 10:])  # Tras el primer par de minutos
+    # Un desfase fijo acumularía deriva_ppm * 1.2 s = 120 ms al final
+    assert errores.max() < 1.0
+
+
+def test_reinicio_del_dispositivo():
+    reloj = RelojDispositivo()
+    for t in range(0, 5000, 20):
+        reloj.observar(t, 1000.0 + t)
+    reloj.observar(10.0, 8000.0)  # El contador del Arduino vuelve a empezar
+    assert reloj.convertir(10.0) == pytest.approx(8000.0)
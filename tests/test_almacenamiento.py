@@ -0,0 +1,71 @@
+# ===== Pruebas del formato .bpm =====
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+APP = os.path.join(os.path.dirname(__file__), '..', 'app')
+sys.path.insert(0, APP)
+from almacenamiento import (EscritorBinario, binario_a_csv, cargar_binario, crear_escritor,
+                            csv_a_binario, leer_csv_crudo)
+
+
+def grabacion(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    t_ms = np.cumsum(rng.integers(1, 15, n)).astype(np.uint32)
+    kg = rng.normal(5.0, 2.0, n).astype(np.float32)
+    return t_ms, kg
+
+
+@pytest.mark.parametrize('n', [0, 1, 1000, 70000])
+def test_ida_y_vuelta_csv_bpm(tmp_path, n):
+    t_ms, kg = grabacion(n)
+    with crear_escritor(str(tmp_path / 'a.csv')) as escritor:
+        escritor.escribir(t_ms, kg)
+    csv_a_binario(str(tmp_path / 'a.csv'), str(tmp_path / 'b.bpm'))
+    t_bin, kg_bin = cargar_binario(str(tmp_path / 'b.bpm'))
+    assert np.array_equal(t_bin, t_ms)
+    assert np.allclose(kg_bin, kg, rtol=0, atol=6e-5)  # El CSV guarda 4 decimales
+
+    binario_a_csv(str(tmp_path / 'b.bpm'), str(tmp_path / 'c.csv'))
+    t_csv, kg_csv = leer_csv_crudo(str(tmp_path / 'c.csv'))
+    assert np.array_equal(t_csv, t_ms)
+    assert np.allclose(kg_csv, kg, rtol=0, atol=6e-5)  # El CSV guarda 4 decimales
+    assert sorted(os.listdir(tmp_path)) == ['a.csv', 'b.bpm', 'c.csv']  # Sin temporales
+
+
+def test_escritor_binario_por_bloques(tmp_path):
+    t_ms, kg = grabacion(5000)
+    ruta = str(tmp_path / 'g.bpm')
+    with EscritorBinario(ruta) as escritor:
+        for i in range(0, len(t_ms), 777):
+            escritor.escribir(t_ms[i:i + 777], kg[i:i + 777])
+        escritor.sincronizar()
+        assert not os.path.exists(ruta)  # El destino solo aparece al cerrar
+    t_bin, kg_bin = cargar_binario(ruta)
+    assert np.array_equal(t_bin, t_ms)
+    assert np.array_equal(kg_bin, kg)
+
+
+def test_regrabar_un_bpm_mapeado(tmp_path):
+    # Un lector mantiene el .bpm mapeado mientras una grabación nueva sustituye el archivo;
+    # en un proceso aparte porque antes moría con SIGBUS
+    codigo = textwrap.dedent(f"""
+        import sys
+        import numpy as np
+        sys.path.insert(0, {APP!r})
+        from almacenamiento import cargar_binario, guardar_binario
+        from fragmentos import EscritorFragmentado
+        ruta = {str(tmp_path / 'm.bpm')!r}
+        guardar_binario(ruta, np.arange(60000, dtype=np.uint32), np.ones(60000, np.float32))
+        t, f = cargar_binario(ruta)
+        with EscritorFragmentado(ruta, muestras_por_fragmento=1000) as escritor:
+            escritor.escribir(np.arange(10, dtype=np.uint32), np.zeros(10, np.float32))
+        print(float(f.sum()), int(t[-1]), len(cargar_binario(ruta)[0]))
+    """)
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True)
+    assert salida.returncode == 0, salida.stderr
+    assert salida.stdout.split() == ['60000.0', '59999', '10']
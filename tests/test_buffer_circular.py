@@ -0,0 +1,42 @@
+# ===== Pruebas del buffer circular =====
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from buffer_circular import BufferCircular
+
+
+def test_leer_en_orden_tras_dar_la_vuelta():
+    buffer = BufferCircular(16, margen=4)
+    buffer.escribir(np.arange(40.0), np.arange(40.0))
+    t, f = buffer.ultimos(100)
+    assert len(t) == buffer.maximo_lectura
+    assert np.array_equal(t, np.arange(40.0 - len(t), 40.0))
+
+
+def test_lecturas_monotonas_con_productor_concurrente():
+    # Un productor escribe sin parar mientras el consumidor pide la ventana más grande
+    buffer = BufferCircular(4096)
+    fin = threading.Event()
+
+    def producir():
+        siguiente = 0
+        while not fin.is_set():
+            n = 1 + siguiente % 700
+            t = np.arange(siguiente, siguiente + n, dtype=float)
+            buffer.escribir(t, t)
+            siguiente += n
+
+    hilo = threading.Thread(target=producir)
+    hilo.start()
+    try:
+        for _ in range(3000):
+            t, f = buffer.ultimos(buffer.capacidad)
+            assert np.all(np.diff(t) == 1.0)
+            assert np.array_equal(t, f)
+    finally:
+        fin.set()
+        hilo.join()
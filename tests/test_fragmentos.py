@@ -0,0 +1,47 @@
+# ===== Pruebas de la recuperación de grabaciones interrumpidas =====
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+APP = os.path.join(os.path.dirname(__file__), '..', 'app')
+sys.path.insert(0, APP)
+from almacenamiento import leer_crudo
+from fragmentos import EscritorFragmentado, carpeta_fragmentos, grabacion_interrumpida
+
+
+@pytest.mark.parametrize('extension', ['.bpm', '.csv'])
+def test_reanudar_tras_un_corte(tmp_path, extension):
+    ruta = str(tmp_path / ('empuje' + extension))
+    # El proceso grabador muere a mitad de un registro, sin cerrar nada
+    codigo = textwrap.dedent(f"""
+        import os, sys
+        import numpy as np
+        sys.path.insert(0, {APP!r})
+        from fragmentos import EscritorFragmentado
+        escritor = EscritorFragmentado({ruta!r}, muestras_por_fragmento=1000)
+        t = np.arange(2500, dtype=np.uint32) * 2
+        escritor.escribir(t, (t % 97).astype(np.float32))
+        escritor._f.write(b'\\x01\\x02\\x03\\x04\\x05')
+        escritor.sincronizar()
+        os._exit(1)
+    """)
+    assert subprocess.run([sys.executable, '-c', codigo]).returncode == 1
+    assert grabacion_interrumpida(ruta)
+    assert not os.path.exists(ruta)
+
+    with EscritorFragmentado(ruta, muestras_por_fragmento=1000, reanudar=True) as escritor:
+        assert escritor.desfase_ms > 2 * 2499
+        t = np.arange(500, dtype=np.uint32) * 2
+        escritor.escribir(t, np.full(500, -1.0, np.float32))
+
+    assert not os.path.exists(carpeta_fragmentos(ruta))
+    t_final, kg_final = leer_crudo(ruta)
+    assert len(t_final) == 3000
+    assert np.all(np.diff(t_final.astype(np.int64)) > 0)
+    assert np.array_equal(t_final[:2500], np.arange(2500) * 2)
+    assert np.array_equal(kg_final[:2500], np.arange(2500) * 2 % 97)
+    assert np.all(kg_final[2500:] == -1.0)
@@ -0,0 +1,22 @@
+# ===== Pruebas de la exportación de motor =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from motor import PUNTOS_ENG, curva_motor
+
+
+def test_curva_recortada_al_quemado():
+    # Ruido por encima del umbral de carga antes de la ignición y después del apagado
+    t = np.arange(0.0, 10.0, 0.001)
+    f = np.where((t >= 4.0) & (t < 5.0), 100.0, 0.0)
+    f[(t > 0.5) & (t < 3.0)] = 1.0
+    f[t > 6.0] = 1.5
+    t_red, f_red = curva_motor(t, f, PUNTOS_ENG)
+    assert len(t_red) <= PUNTOS_ENG
+    assert t_red[0] == pytest.approx(0.001)  # Un intervalo tras la ignición en t=4
+    assert t_red[-1] - t_red[0] < 1.01
+    assert f_red[-1] == 0.0 and f_red.max() == 100.0
@@ -0,0 +1,46 @@
+# ===== Pruebas del preprocesado en streaming =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from procesamiento import FiltroButterworth, FiltroSavitzkyGolay, RechazoAtipicos, Remuestreo
+
+
+def senal(semilla=0):
+    """Quemado a ~1 kHz con Tiempo_ms entero (con instantes repetidos), ruido y picos sueltos."""
+    rng = np.random.default_rng(semilla)
+    t = np.floor(np.cumsum(rng.uniform(0.9, 1.1, 3000))) / 1000.0
+    f = 50.0 * np.clip((t - 0.5) / 0.05, 0, 1) * np.clip((2.5 - t) / 0.2, 0, 1)
+    f = f + rng.normal(0.0, 0.3, len(t))
+    f[rng.integers(0, len(t), 20)] += 30.0
+    return t, f
+
+
+def en_bloques(etapa, t, f, semilla=1):
+    rng = np.random.default_rng(semilla)
+    salidas = []
+    i = 0
+    while i < len(t):
+        n = int(rng.integers(1, 200))
+        salidas.append(etapa.bloque(t[i:i + n], f[i:i + n]))
+        i += n
+    salidas.append(etapa.finalizar())
+    return np.concatenate([s[0] for s in salidas]), np.concatenate([s[1] for s in salidas])
+
+
+@pytest.mark.parametrize('crear, tolerancia', [
+    (RechazoAtipicos, 1e-12),
+    (FiltroSavitzkyGolay, 1e-4),
+    (lambda: Remuestreo(1000.0), 1e-9),
+    (FiltroButterworth, 1e-2),
+])
+def test_streaming_coincide_con_bloque(crear, tolerancia):
+    t, f = senal()
+    t_bloque, f_bloque = crear().procesar(t, f)
+    t_stream, f_stream = en_bloques(crear(), t, f)
+    assert len(t_stream) == len(t_bloque)
+    assert np.allclose(t_stream, t_bloque, rtol=0, atol=1e-9)
+    assert np.max(np.abs(f_stream - f_bloque)) < tolerancia
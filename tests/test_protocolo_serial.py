@@ -0,0 +1,91 @@
+# ===== Pruebas de los lectores del puerto serie =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from protocolo_serial import AVISO_TARE, ENCABEZADO_CSV, TAM_TRAMA, codificar_tramas, crear_lector
+
+
+def muestras(n, t0=0):
+    t_ms = t0 + np.arange(n, dtype=np.uint32) * 2
+    return t_ms, (t_ms / 100.0).astype(np.float32)
+
+
+def leer(datos, trozos):
+    """Pasa 'datos' al lector de una vez o en trozos aleatorios, como llegan del puerto."""
+    lector = crear_lector('binario')
+    rng = np.random.default_rng(0)
+    partes_t, partes_kg = [], []
+    i = 0
+    while i < len(datos):
+        n = len(datos) if not trozos else int(rng.integers(1, 3 * TAM_TRAMA))
+        t_ms, kg, mensajes = lector.procesar(datos[i:i + n])
+        assert mensajes == []
+        partes_t.append(t_ms)
+        partes_kg.append(kg)
+        i += n
+    return np.concatenate(partes_t), np.concatenate(partes_kg), lector.estadisticas()
+
+
+@pytest.fixture(params=[False, True], ids=['entero', 'trozos'])
+def trozos(request):
+    return request.param
+
+
+def test_flujo_limpio(trozos):
+    t_ms, kg = muestras(500)
+    t, f, est = leer(codificar_tramas(t_ms, kg), trozos)
+    assert np.array_equal(t, t_ms) and np.array_equal(f, kg)
+    assert est == {'ok': 500, 'perdidas': 0, 'corruptas': 0}
+
+
+def test_basura_y_resincronizacion(trozos):
+    t_ms, kg = muestras(200)
+    basura = bytes([0x00, 0xAA, 0x13, 0x55, 0xAA, 0xAA, 0x55, 0x01, 0x02])
+    datos = basura + codificar_tramas(t_ms[:100], kg[:100]) + basura + codificar_tramas(t_ms[100:], kg[100:], 100)
+    t, f, est = leer(datos, trozos)
+    assert np.array_equal(t, t_ms) and np.array_equal(f, kg)
+    assert est == {'ok': 200, 'perdidas': 0, 'corruptas': 2}
+
+
+def test_saltos_de_secuencia(trozos):
+    # Dos tramas que no llegaron y el paso del contador de 65535 a 0
+    t_ms, kg = muestras(100)
+    datos = (codificar_tramas(t_ms[:50], kg[:50], 65500)
+             + codificar_tramas(t_ms[50:], kg[50:], (65500 + 52) & 0xFFFF))
+    t, f, est = leer(datos, trozos)
+    assert np.array_equal(t, t_ms)
+    assert est == {'ok': 100, 'perdidas': 2, 'corruptas': 0}
+
+
+def test_byte_corrupto(trozos):
+    # El checksum descarta la trama: cuenta como corrupta y como perdida por la secuencia
+    t_ms, kg = muestras(100)
+    datos = bytearray(codificar_tramas(t_ms, kg))
+    datos[40 * TAM_TRAMA + 9] ^= 0x10
+    t, f, est = leer(bytes(datos), trozos)
+    assert np.array_equal(t, np.delete(t_ms, 40))
+    assert est == {'ok': 99, 'perdidas': 1, 'corruptas': 1}
+
+
+def test_trama_cortada(trozos):
+    # Se pierden bytes a mitad de una trama (desbordamiento del buffer del puerto)
+    t_ms, kg = muestras(100)
+    datos = codificar_tramas(t_ms, kg)
+    corte = 60 * TAM_TRAMA + 5
+    t, f, est = leer(datos[:corte] + datos[corte + 4:], trozos)
+    assert np.array_equal(t, np.delete(t_ms, 60))
+    assert est == {'ok': 99, 'perdidas': 1, 'corruptas': 1}
+
+
+def test_ascii_mensajes_del_sketch():
+    lector = crear_lector('ascii')
+    texto = f"{ENCABEZADO_CSV}\n0,0.0000\n12,1.5\n{AVISO_TARE}\nbasura\n20,2.2500\n30,".encode()
+    t_ms, kg, mensajes = lector.procesar(texto)
+    assert t_ms.tolist() == [0, 12, 20]
+    assert np.allclose(kg, [0.0, 1.5, 2.25])
+    assert mensajes == [ENCABEZADO_CSV, AVISO_TARE, 'basura']
+    assert lector.estadisticas() == {'ok': 3, 'perdidas': 0, 'corruptas': 1}
@@ -0,0 +1,39 @@
+# ===== Pruebas de la simulación de vuelo =====
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from trayectoria import simular_lote, simular_vuelo, area_referencia
+
+
+def curva_regresiva(duracion=3.0, hz=1000, empuje_max=100.0):
+    """Empuje que cae a la mitad a lo largo del quemado, con rampas de subida y apagado."""
+    t = np.arange(0.0, duracion, 1.0 / hz)
+    x = t / duracion
+    f = empuje_max * (1.0 - 0.5 * x) * np.clip(x / 0.05, 0, 1) * np.clip((1 - x) / 0.1, 0, 1)
+    return t, f + 0.5
+
+
+@pytest.mark.parametrize('masa', [5.0, 7.0, 8.0])
+def test_lote_coincide_con_simular_vuelo(masa):
+    t, f = curva_regresiva()
+    area = area_referencia(0.08)
+    lote = simular_lote(t, f, np.array([masa]), 0.4, 0.5, area)
+    vuelo = simular_vuelo(t, f, masa, 0.4, 0.5, area)
+    assert lote['apogeo'][0] == pytest.approx(vuelo['apogeo'], rel=1e-3, abs=1e-2)
+    assert lote['tiempo_apogeo'][0] == pytest.approx(vuelo['tiempo_apogeo'], abs=1e-2)
+
+
+def test_apogeo_antes_del_apagado():
+    # Cohete pesado: frena y cae con la cola de empuje aún encendida
+    t, f = curva_regresiva()
+    area = area_referencia(0.08)
+    lote = simular_lote(t, f, np.array([8.0]), 0.4, 0.5, area)
+    vuelo = simular_vuelo(t, f, 8.0, 0.4, 0.5, area)
+    assert 0 < vuelo['tiempo_apogeo'] < t[-1]
+    assert 0 < lote['tiempo_apogeo'][0] < t[-1]
+    assert lote['apogeo'][0] > 0
+    assert lote['apogeo'][0] == pytest.approx(vuelo['apogeo'], rel=1e-3, abs=1e-2)